@@ -0,0 +1,76 @@
+import time
+import asyncio
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List
+
+from astrbot.api import logger
+
+
+class BotHandle:
+    """没有消息事件时（启动、重连）审阅积压请求用的最小事件接口。
+
+    提供 _review_request_core 与管理员检查用到的 bot / get_self_id / get_group，
+    get_group 与 AiocqhttpMessageEvent.get_group 一样通过群成员列表得到管理员与群主。
+    """
+
+    def __init__(self, bot: Any, self_id: str):
+        self.bot = bot
+        self.self_id = str(self_id)
+
+    def get_self_id(self) -> str:
+        return self.self_id
+
+    async def get_group(self, group_id: str):
+        members = await self.bot.call_action(
+            "get_group_member_list", group_id=int(group_id), self_id=int(self.self_id)
+        )
+        owner_id = None
+        admin_ids = []
+        for member in members or []:
+            if member.get("role") == "owner":
+                owner_id = member.get("user_id")
+            elif member.get("role") == "admin":
+                admin_ids.append(member.get("user_id"))
+        return SimpleNamespace(group_id=str(group_id), group_admins=admin_ids, group_owner=owner_id)
+
+
+async def run_by_group(
+    groups: Dict[str, List[Any]],
+    worker: Callable[[str, Any], Awaitable[str]],
+    concurrency: int = 4,
+    progress_interval: float = 5.0,
+    label: str = "积压审阅",
+) -> Dict[str, int]:
+    """并发处理按群分组的任务：不同群并行，同一群内按列表顺序依次处理，
+    同时进行中的任务数不超过 concurrency。worker 返回结果类型，汇总后返回各类型数量。
+    """
+    total = sum(len(items) for items in groups.values())
+    semaphore = asyncio.Semaphore(max(1, int(concurrency)))
+    outcomes: Dict[str, int] = {}
+    done = 0
+    start = last_report = time.monotonic()
+
+    async def _run_group(group_id: str, items: List[Any]) -> None:
+        nonlocal done, last_report
+        for item in items:
+            async with semaphore:
+                try:
+                    outcome = await worker(group_id, item)
+                except Exception as e:
+                    logger.error(f"[审阅加群] {label}失败 group_id={group_id}: {e}")
+                    outcome = "error"
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+            done += 1
+            now = time.monotonic()
+            if now - last_report >= progress_interval:
+                last_report = now
+                logger.info(f"[审阅加群] {label}进度 {done}/{total}，{done / (now - start):.1f} 条/秒")
+
+    await asyncio.gather(*(_run_group(gid, items) for gid, items in groups.items()))
+    elapsed = time.monotonic() - start
+    if total:
+        logger.info(
+            f"[审阅加群] {label}完成 {done}/{total} 条，用时 {elapsed:.1f} 秒"
+            f"（{done / elapsed if elapsed else 0:.1f} 条/秒），结果: {outcomes}"
+        )
+    return outcomes
@@ -0,0 +1,122 @@
+"""多仓库批量刷新（GraphQL）的检查。
+
+启动本地假 GitHub（REST + GraphQL），配置 Token 与若干群单独仓库，依次调用
+_refresh_all_windows 并检查：
+  - 每次刷新只发出一次 GraphQL 查询，小仓库不再走 REST；
+  - 不存在的仓库在批量结果中为 None，不影响其他仓库，窗口保持为空；
+  - 窗口大于 100 或新提交超过 100 条、批量结果无法与已有窗口衔接时，该仓库回退到 REST 翻页；
+  - 新提交不超过 100 条时批量结果直接合并，不产生 REST 请求。
+
+需要在装有 AstrBot 的环境中运行：
+
+    python benchmarks/batch_refresh_check.py --shared
+"""
+
+import os
+import sys
+import asyncio
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(ROOT))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_review import FakeGitHub  # noqa: E402
+
+MAIN_REPO = "bench/main"
+SMALL_REPO = "bench/small"
+BIG_REPO = "bench/big"
+MISSING_REPO = "bench/missing"
+WINDOW = 20
+BIG_WINDOW = 200
+
+
+def _window(plugin, repo: str):
+    key = next(k for k in plugin._all_window_cfgs() if k[0] == repo)
+    return plugin._get_commit_window(key)
+
+
+async def _refresh(plugin, github: FakeGitHub) -> tuple[int, int]:
+    """刷新一次，返回本次 GraphQL / REST 请求数"""
+    graphql, rest = github.graphql_calls, github.calls
+    await plugin._refresh_all_windows()
+    return github.graphql_calls - graphql, github.calls - rest
+
+
+async def main(args) -> None:
+    import importlib
+    from astrbot.api.star import StarTools
+
+    data_dir = tempfile.mkdtemp(prefix="sha_batch_")
+    StarTools.get_data_dir = staticmethod(lambda name="astrbot_plugin_sha": data_dir)
+    module = importlib.import_module(f"{os.path.basename(ROOT)}.main")
+
+    github = FakeGitHub(commit_total=300, latency_ms=args.github_latency_ms)
+    github.missing.add(MISSING_REPO)
+    await github.start()
+    plugin = module.GitHubShaPlugin(None, {
+        "github_api_base": github.base_url,
+        "github_token": "bench-token",
+        "github_repo": MAIN_REPO,
+        "commit_count": WINDOW,
+        "group_repo_overrides": [
+            f"101={SMALL_REPO}",
+            f"102={BIG_REPO}:{BIG_WINDOW}",
+            f"103={MISSING_REPO}",
+        ],
+        "shared_commit_cache": args.shared,
+        "reset_hour": -1,
+        "backlog_review_on_start": False,
+    })
+    await plugin.initialize()
+    await plugin._ready.wait()
+    try:
+        # 客户端层：不存在的仓库在对应位置返回 None
+        batch = await plugin._github.fetch_commits_batch([
+            (SMALL_REPO, "main", WINDOW, None),
+            (MISSING_REPO, "main", WINDOW, None),
+        ])
+        assert batch[1] is None, "不存在的仓库应返回 None"
+        assert [c["sha"] for c in batch[0]] == [c["sha"] for c in github.commits[:WINDOW]], "批量结果不一致"
+        github.graphql_calls = 0
+
+        # 首次刷新：大窗口仓库只能从批量结果拿到 100 条，回退到 REST 翻页补齐
+        graphql, rest = await _refresh(plugin, github)
+        print(f"首次刷新: GraphQL {graphql} 次，REST {rest} 次")
+        assert graphql == 1, "首次刷新应只有一次 GraphQL 查询"
+        assert rest >= 2, "大窗口仓库应回退到 REST 翻页"
+        assert len(_window(plugin, SMALL_REPO)) == WINDOW
+        assert len(_window(plugin, MAIN_REPO)) == WINDOW
+        assert len(_window(plugin, BIG_REPO)) == BIG_WINDOW
+        assert len(_window(plugin, MISSING_REPO)) == 0, "不存在的仓库窗口应为空"
+
+        # 新提交不超过 100 条：批量结果可与窗口衔接，直接合并
+        small_new = github.push(SMALL_REPO, 5)
+        big_new = github.push(BIG_REPO, 3)
+        graphql, rest = await _refresh(plugin, github)
+        print(f"少量新提交: GraphQL {graphql} 次，REST {rest} 次")
+        assert graphql == 1 and rest == 0, "少量新提交时不应走 REST"
+        assert all(_window(plugin, SMALL_REPO).contains(sha) for sha in small_new)
+        assert all(_window(plugin, BIG_REPO).contains(sha) for sha in big_new)
+        assert not _window(plugin, MAIN_REPO).contains(small_new[0]), "其他仓库的提交不应混入"
+
+        # 新提交超过 100 条：批量结果无法衔接，该仓库回退到 REST 翻页
+        big_new = github.push(BIG_REPO, 150)
+        graphql, rest = await _refresh(plugin, github)
+        print(f"大量新提交: GraphQL {graphql} 次，REST {rest} 次")
+        assert graphql == 1 and rest >= 2, "大量新提交时应回退到 REST 翻页"
+        window = _window(plugin, BIG_REPO)
+        assert all(window.contains(sha) for sha in big_new), "回退翻页后仍缺少新提交"
+        assert len(window) == BIG_WINDOW
+        print("检查通过")
+    finally:
+        await plugin.terminate()
+        await github.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="astrbot_plugin_sha 多仓库批量刷新检查")
+    parser.add_argument("--github-latency-ms", type=float, default=20)
+    parser.add_argument("--shared", action="store_true", help="同时启用共享提交快照")
+    asyncio.run(main(parser.parse_args()))
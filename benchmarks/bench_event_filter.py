@@ -0,0 +1,115 @@
+"""普通聊天消息经过本插件处理器时的单条开销微基准。
+
+对比两种分发方式：
+  - 旧：@filter.regex(r"(?i)\\bhash\\b") + EventMessageType.ALL，每条消息都要执行正则，
+    并进入 capture_group_add_requests 协程后才被丢弃；
+  - 新：ReviewEventFilter / HashKeywordFilter 在分发阶段同步判断，普通消息不创建协程。
+
+    python benchmarks/bench_event_filter.py --messages 200000
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import asyncio
+import argparse
+import importlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(ROOT))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_review import _load_plugin_module, FakeBot, FakeEvent  # noqa: E402
+
+_WORDS = [
+    "早上好", "今天吃什么", "哈哈哈哈", "有人在吗", "这个 bug 怎么修", "看看日志",
+    "ok", "thanks", "lol", "the build is green", "hello world", "[CQ:image,file=abc.jpg]",
+    "插件更新了吗", "how do I install this", "what's the hash of the latest commit",
+]
+
+
+def _make_messages(n: int, hash_ratio: float, seed: int = 1):
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(n):
+        text = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(1, 6)))
+        if rng.random() < hash_ratio:
+            text = "hash " + text
+        messages.append({
+            "post_type": "message",
+            "message_type": "group",
+            "group_id": 100000 + rng.randint(0, 50),
+            "user_id": 10_000_000 + rng.randint(0, 5000),
+            "raw_message": text,
+        })
+    return messages
+
+
+def _per_msg_ns(elapsed: float, n: int) -> float:
+    return elapsed / n * 1e9
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="astrbot_plugin_sha 事件过滤微基准")
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--hash-ratio", type=float, default=0.001)
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数，取最快一次")
+    args = parser.parse_args()
+
+    module = _load_plugin_module()
+    filters = importlib.import_module(f"{os.path.basename(ROOT)}.event_filters")
+    plugin = module.GitHubShaPlugin(None, {"reset_hour": -1})
+
+    bot = FakeBot(0)
+    events = []
+    for raw in _make_messages(args.messages, args.hash_ratio):
+        event = FakeEvent(bot, raw)
+        event.message_str = raw["raw_message"]
+        events.append(event)
+
+    # 旧路径：RegexFilter 等价实现 + 每条消息进入处理器协程
+    old_regex = re.compile(r"(?i)\bhash\b")
+
+    async def _old() -> int:
+        hits = 0
+        for event in events:
+            if old_regex.match(event.message_str.strip()):
+                hits += 1
+            await plugin.capture_group_add_requests(event)
+        return hits
+
+    # 新路径：同步过滤器，普通消息不进入处理器
+    review_filter = filters.ReviewEventFilter()
+    hash_filter = filters.HashKeywordFilter()
+
+    async def _new() -> int:
+        hits = 0
+        for event in events:
+            if hash_filter.filter(event, None):
+                hits += 1
+            if review_filter.filter(event, None):
+                await plugin.capture_group_add_requests(event)
+        return hits
+
+    async def _best(fn) -> tuple[int, float]:
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            hits = await fn()
+            best = min(best, time.perf_counter() - start)
+        return hits, best
+
+    old_hits, old_elapsed = await _best(_old)
+    new_hits, new_elapsed = await _best(_new)
+
+    assert old_hits == new_hits, (old_hits, new_hits)
+    print(f"messages: {args.messages}, hash 触发: {new_hits}")
+    print(f"旧 (regex + ALL 处理器): {_per_msg_ns(old_elapsed, args.messages):8.0f} ns/条")
+    print(f"新 (同步预过滤):         {_per_msg_ns(new_elapsed, args.messages):8.0f} ns/条")
+    await plugin.terminate()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
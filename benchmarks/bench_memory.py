@@ -0,0 +1,126 @@
+"""待审请求与错误次数的内存占用对比。
+
+从同样的 JSON 数据加载，用 tracemalloc 统计加载完成（丢弃解析出的 JSON 之后）常驻的内存：
+  - 旧：群号 → 用户 → dict 记录的嵌套字典 + (ts, 群号字符串, 用户字符串) 堆；
+        错误次数为 OrderedDict[(群号, 用户), (代, 次数)]；
+  - 新：PendingRequestCache（__slots__ 记录，打包成一个 int 的键）与 DailyErrorCounter。
+
+    python benchmarks/bench_memory.py --requests 100000 --groups 300
+"""
+
+import gc
+import os
+import sys
+import json
+import heapq
+import random
+import argparse
+import importlib
+import tracemalloc
+from collections import OrderedDict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(ROOT))
+
+pending = importlib.import_module(f"{os.path.basename(ROOT)}.pending")
+error_counter = importlib.import_module(f"{os.path.basename(ROOT)}.error_counter")
+
+
+class LegacyPendingCache:
+    """原 PendingRequestCache 的数据布局"""
+
+    def load(self, data):
+        self._data = {}
+        self._heap = []
+        for group_id, users in data.items():
+            for user_id, record in users.items():
+                self._data.setdefault(str(group_id), {})[str(user_id)] = record
+                self._heap.append((int(record.get("ts", 0)), str(group_id), str(user_id)))
+        heapq.heapify(self._heap)
+
+
+class LegacyErrorCounter:
+    """原 DailyErrorCounter 的数据布局"""
+
+    def load(self, data, gen, today):
+        self._counts = OrderedDict()
+        for group_id, users in data.items():
+            for user_id, dates in users.items():
+                for date, count in dates.items():
+                    if date == today:
+                        self._counts[(int(group_id), int(user_id))] = (gen, int(count))
+
+
+def _make_json(requests: int, groups: int, today: str, seed: int = 1) -> tuple[str, str]:
+    rng = random.Random(seed)
+    pending_data, error_data = {}, {}
+    for i in range(requests):
+        group_id = str(100_000_000 + rng.randrange(groups) * 7919)
+        user_id = str(rng.randrange(10_000, 3_999_999_999))
+        pending_data.setdefault(group_id, {})[user_id] = {
+            "flag": f"{rng.getrandbits(64):016x}{i}",
+            "sub_type": rng.choice(["add", "add", "add", "invite"]),
+            "comment": rng.choice(["", "提交号 " + f"{rng.getrandbits(32):08x}", "我来学习的"]),
+            "ts": 1_760_000_000 + i,
+        }
+        error_data.setdefault(group_id, {})[user_id] = {today: 1 + i % 3}
+    return json.dumps(pending_data, ensure_ascii=False), json.dumps(error_data)
+
+
+def _measure(build) -> tuple[int, object]:
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, obj
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="astrbot_plugin_sha 内存占用基准")
+    parser.add_argument("--requests", type=int, default=100000)
+    parser.add_argument("--groups", type=int, default=300)
+    args = parser.parse_args()
+
+    counter = error_counter.DailyErrorCounter()
+    gen, today = counter.generation, counter.date
+    pending_text, error_text = _make_json(args.requests, args.groups, today)
+    n = sum(len(users) for users in json.loads(pending_text).values())
+
+    def _legacy_pending():
+        cache = LegacyPendingCache()
+        cache.load(json.loads(pending_text))
+        return cache
+
+    def _new_pending():
+        cache = pending.PendingRequestCache()
+        cache.load(json.loads(pending_text))
+        return cache
+
+    def _legacy_errors():
+        legacy = LegacyErrorCounter()
+        legacy.load(json.loads(error_text), gen, today)
+        return legacy
+
+    def _new_errors():
+        new = error_counter.DailyErrorCounter()
+        new.load(json.loads(error_text))
+        return new
+
+    old_p, _ = _measure(_legacy_pending)
+    new_p, cache = _measure(_new_pending)
+    old_e, _ = _measure(_legacy_errors)
+    new_e, _ = _measure(_new_errors)
+
+    # 序列化结果与原 JSON 一致
+    assert cache.to_json() == json.loads(pending_text)
+
+    print(f"待审请求 {n} 条（{args.groups} 个群）")
+    print(f"{'':<10} {'旧 字节/条':>12} {'新 字节/条':>12} {'节省':>8}")
+    print(f"{'待审请求':<10} {old_p / n:>12.0f} {new_p / n:>12.0f} {1 - new_p / old_p:>8.1%}")
+    print(f"{'错误次数':<10} {old_e / n:>12.0f} {new_e / n:>12.0f} {1 - new_e / old_e:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+"""自动审阅加群流程的压测脚本。
+
+模拟一次入群“突袭”：并发投递大量 OneBot 入群请求事件给 capture_group_add_requests，
+使用假的 bot（set_group_add_request / send_group_msg / get_group）与本地假 GitHub
+commits 接口（可配置延迟），统计吞吐量与 p50/p95/p99 单条审阅延迟。
+
+需要在装有 AstrBot 的环境中运行，例如在插件目录下：
+
+    python benchmarks/bench_review.py --bursts 50,200,1000 --blacklist 0,20000 \\
+        --groups 1,20 --commit-counts 5,200 --github-latency-ms 80
+
+数据目录使用临时目录，不会影响正式数据。
+"""
+
+import os
+import sys
+import re
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+import importlib
+import itertools
+import tempfile
+from typing import Any, Dict, List
+
+from aiohttp import web
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(ROOT))
+
+
+def _load_plugin_module():
+    """以包的形式导入插件（main.py 使用了相对导入）"""
+    from astrbot.api.star import StarTools
+
+    data_root = tempfile.mkdtemp(prefix="sha_bench_")
+
+    def _get_data_dir(name: str = "astrbot_plugin_sha"):
+        path = os.path.join(data_root, name, str(time.monotonic_ns()))
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    StarTools.get_data_dir = staticmethod(_get_data_dir)
+    return importlib.import_module(f"{os.path.basename(ROOT)}.main")
+
+
+def _fake_shas(n: int) -> List[str]:
+    return [hashlib.sha1(f"bench-{i}".encode()).hexdigest() for i in range(n)]
+
+
+def _fake_commit(sha: str, message: str) -> Dict[str, Any]:
+    return {
+        "sha": sha,
+        "commit": {
+            "message": message,
+            "author": {"name": "bench", "date": "2026-01-01T00:00:00Z"},
+            "committer": {"name": "bench", "date": "2026-01-01T00:00:00Z"},
+        },
+    }
+
+
+class FakeGitHub:
+    """本地假 GitHub：REST /repos/{owner}/{repo}/commits（分页、ETag）与 GraphQL 批量查询，
+    带固定延迟。默认所有仓库共用同一组提交；push 可为单个仓库追加新提交，missing 中的仓库返回不存在"""
+
+    _GRAPHQL_FIELD = re.compile(r"(r\d+): repository\(owner: \$(o\d+), name: \$(n\d+)\).*?history\(first: (\d+)")
+
+    def __init__(self, commit_total: int, latency_ms: float):
+        self.latency = latency_ms / 1000
+        self.calls = 0
+        self.graphql_calls = 0
+        self.commits = [_fake_commit(sha, f"bench commit {i}") for i, sha in enumerate(_fake_shas(commit_total))]
+        self.repo_commits: Dict[str, List[Dict[str, Any]]] = {}
+        self.missing: set[str] = set()
+        self._pushed = 0
+        self._runner: web.AppRunner | None = None
+        self.base_url = ""
+
+    def commits_for(self, repo: str) -> List[Dict[str, Any]] | None:
+        repo = repo.lower()
+        if repo in self.missing:
+            return None
+        return self.repo_commits.get(repo, self.commits)
+
+    def push(self, repo: str, count: int) -> List[str]:
+        """在仓库分支头追加 count 个新提交，返回新提交 SHA（新 → 旧）"""
+        repo = repo.lower()
+        shas = [
+            hashlib.sha1(f"push-{repo}-{self._pushed + i}".encode()).hexdigest()
+            for i in range(count)
+        ]
+        self._pushed += count
+        fresh = [_fake_commit(sha, f"{repo} pushed commit") for sha in reversed(shas)]
+        self.repo_commits[repo] = fresh + self.repo_commits.get(repo, self.commits)
+        return [c["sha"] for c in fresh]
+
+    async def _commits(self, request: web.Request) -> web.Response:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        commits = self.commits_for(f"{request.match_info['owner']}/{request.match_info['repo']}")
+        if commits is None:
+            return web.json_response({"message": "Not Found"}, status=404)
+        per_page = int(request.query.get("per_page", 30))
+        page = int(request.query.get("page", 1))
+        etag = f'"bench-{commits[0]["sha"][:12]}-{len(commits)}-{page}-{per_page}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        body = commits[(page - 1) * per_page: page * per_page]
+        return web.json_response(body, headers={"ETag": etag})
+
+    async def _graphql(self, request: web.Request) -> web.Response:
+        """只支持 GitHubClient.fetch_commits_batch 生成的查询结构"""
+        self.graphql_calls += 1
+        await asyncio.sleep(self.latency)
+        payload = await request.json()
+        variables = payload.get("variables") or {}
+        data: Dict[str, Any] = {}
+        for alias, owner_var, name_var, first in self._GRAPHQL_FIELD.findall(payload.get("query", "")):
+            commits = self.commits_for(f"{variables[owner_var]}/{variables[name_var]}")
+            if commits is None:
+                data[alias] = None
+                continue
+            nodes = [
+                {
+                    "oid": c["sha"],
+                    "messageHeadline": c["commit"]["message"],
+                    "committedDate": c["commit"]["committer"]["date"],
+                    "author": {"name": c["commit"]["author"]["name"], "date": c["commit"]["author"]["date"]},
+                }
+                for c in commits[: int(first)]
+            ]
+            data[alias] = {"ref": {"target": {"history": {"nodes": nodes}}}}
+        body: Dict[str, Any] = {"data": data}
+        if any(v is None for v in data.values()):
+            body["errors"] = [{"type": "NOT_FOUND", "message": "Could not resolve to a Repository"}]
+        return web.json_response(body)
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/repos/{owner}/{repo}/commits", self._commits)
+        app.router.add_post("/graphql", self._graphql)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+
+
+class _Group:
+    def __init__(self, self_id: str):
+        self.group_admins = [self_id]
+        self.group_owner = "10000"
+
+
+class FakeBot:
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000
+        self.approved = 0
+        self.rejected = 0
+        self.messages = 0
+        self.get_group_calls = 0
+
+    async def set_group_add_request(self, flag: str, sub_type: str, approve: bool, reason: str = ""):
+        await asyncio.sleep(self.latency)
+        if approve:
+            self.approved += 1
+        else:
+            self.rejected += 1
+
+    async def send_group_msg(self, group_id: str, message: str):
+        await asyncio.sleep(self.latency)
+        self.messages += 1
+
+
+class _MessageObj:
+    __slots__ = ("raw_message",)
+
+    def __init__(self, raw: Dict[str, Any]):
+        self.raw_message = raw
+
+
+class FakeEvent:
+    """capture_group_add_requests 用到的 AiocqhttpMessageEvent 接口子集"""
+
+    SELF_ID = "20000"
+
+    def __init__(self, bot: FakeBot, raw: Dict[str, Any]):
+        self.bot = bot
+        self.message_obj = _MessageObj(raw)
+
+    def get_self_id(self) -> str:
+        return self.SELF_ID
+
+    def get_group_id(self) -> str:
+        return str(self.message_obj.raw_message.get("group_id", ""))
+
+    async def get_group(self, group_id: str):
+        self.bot.get_group_calls += 1
+        await asyncio.sleep(self.bot.latency)
+        return _Group(self.SELF_ID)
+
+    def plain_result(self, text: str) -> str:
+        return text
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+async def run_scenario(
+    module,
+    burst: int,
+    blacklist_size: int,
+    groups: int,
+    commit_count: int,
+    github_latency_ms: float,
+    bot_latency_ms: float,
+) -> Dict[str, Any]:
+    github = FakeGitHub(max(commit_count, 10), github_latency_ms)
+    await github.start()
+    config = {
+        "github_api_base": github.base_url,
+        "commit_count": commit_count,
+        "auto_review_on_request": True,
+        "max_attempts": 3,
+        "reset_hour": -1,
+        "notify_merge_window": 0,
+        "notify_rate_per_minute": 6000,
+    }
+    plugin = module.GitHubShaPlugin(None, config)
+
+    if blacklist_size:
+        path = os.path.join(plugin._data_dir, "group_join_data.json")
+        per_group = max(1, blacklist_size // groups)
+        reject_ids = {
+            str(100000 + g): [str(50_000_000 + i) for i in range(per_group)]
+            for g in range(groups)
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"reject_ids": reject_ids}, f)
+
+    await plugin.initialize()
+    await plugin._ready.wait()
+    bot = FakeBot(bot_latency_ms)
+    shas = github.commits
+    events = []
+    for i in range(burst):
+        group_id = 100000 + i % groups
+        # 一半答对、四分之一答错、四分之一没写 SHA
+        if i % 2 == 0:
+            comment = f"提交号 {shas[i % commit_count]['sha'][:8]}"
+        elif i % 4 == 1:
+            comment = f"是 {hashlib.md5(str(i).encode()).hexdigest()[:10]} 吗"
+        else:
+            comment = "我来学习的"
+        events.append(FakeEvent(bot, {
+            "post_type": "request",
+            "request_type": "group",
+            "sub_type": "add",
+            "group_id": group_id,
+            "user_id": 10_000_000 + i,
+            "flag": f"flag-{i}",
+            "comment": comment,
+        }))
+
+    latencies: List[float] = []
+
+    async def _one(event: FakeEvent) -> None:
+        start = time.perf_counter()
+        await plugin.capture_group_add_requests(event)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_one(e) for e in events))
+    elapsed = time.perf_counter() - start
+
+    # 等待后台群通知发送完毕再卸载，统计实际发出的消息数
+    await asyncio.gather(*plugin._notifier._workers.values(), return_exceptions=True)
+    await plugin.terminate()
+    await github.stop()
+
+    latencies.sort()
+    return {
+        "burst": burst,
+        "blacklist": blacklist_size,
+        "groups": groups,
+        "commit_count": commit_count,
+        "throughput": burst / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(latencies, 50),
+        "p95_ms": _percentile(latencies, 95),
+        "p99_ms": _percentile(latencies, 99),
+        "github_calls": github.calls,
+        "get_group_calls": bot.get_group_calls,
+        "approved": bot.approved,
+        "rejected": bot.rejected,
+        "messages": bot.messages,
+    }
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(x) for x in value.split(",") if x.strip()]
+
+
+def _print_table(results: List[Dict[str, Any]]) -> None:
+    header = (
+        f"{'burst':>6} {'blacklist':>9} {'groups':>6} {'commits':>7} "
+        f"{'req/s':>9} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8} {'gh':>4} {'get_group':>9} {'msgs':>5}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['burst']:>6} {r['blacklist']:>9} {r['groups']:>6} {r['commit_count']:>7} "
+            f"{r['throughput']:>9.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+            f"{r['github_calls']:>4} {r['get_group_calls']:>9} {r['messages']:>5}"
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="astrbot_plugin_sha 自动审阅压测")
+    parser.add_argument("--bursts", type=_int_list, default=[10, 100, 500])
+    parser.add_argument("--blacklist", type=_int_list, default=[0, 10000])
+    parser.add_argument("--groups", type=_int_list, default=[1, 20])
+    parser.add_argument("--commit-counts", type=_int_list, default=[5, 100])
+    parser.add_argument("--github-latency-ms", type=float, default=50)
+    parser.add_argument("--bot-latency-ms", type=float, default=5)
+    parser.add_argument("--json", help="把结果写入该 JSON 文件")
+    args = parser.parse_args()
+
+    module = _load_plugin_module()
+    results = []
+    for burst, blacklist, groups, commit_count in itertools.product(
+        args.bursts, args.blacklist, args.groups, args.commit_counts
+    ):
+        results.append(await run_scenario(
+            module, burst, blacklist, groups, commit_count,
+            args.github_latency_ms, args.bot_latency_ms,
+        ))
+    _print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
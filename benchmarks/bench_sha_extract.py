@@ -0,0 +1,138 @@
+"""SHA 候选提取的模糊测试与性能对比。
+
+生成接近真实申请附言的 comment（中文夹杂、全角、大写、被空格/短横线拆开、紧贴中文等），
+对比旧的 re.findall + 列表去重实现与 ShaCandidateExtractor：
+  - 正确答案的识别率；
+  - 随机/异常输入下不抛异常，候选均为 7~40 位小写十六进制且无重复；
+  - 普通附言与超长恶意输入下的耗时：未拆开的 SHA 与旧实现基本持平，被拆开的 SHA（旧实现
+    识别不了）约慢 2 倍，混合附言整体约慢 1.5 倍；超长恶意输入下旧实现为平方级、新实现为线性。
+
+    python benchmarks/bench_sha_extract.py --comments 20000 --fuzz 20000
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import hashlib
+import argparse
+from typing import Callable, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sha_extract import ShaCandidateExtractor  # noqa: E402
+
+_FILLERS = ["你好", "我是来学习的", "提交号", "sha 是", "答案：", "麻烦通过一下", "谢谢", "在 GitHub 上看到的", "最新提交", ""]
+_FULLWIDTH = {c: chr(ord(c) + 0xFEE0) for c in "0123456789abcdefABCDEF"}
+
+
+def old_extract(text: str) -> List[str]:
+    """原实现：\\b 边界 + 列表去重（O(n^2)）"""
+    if not text:
+        return []
+    candidates = re.findall(r"\b[a-fA-F0-9]{7,40}\b", text)
+    dedup = []
+    for c in candidates:
+        c = c.lower()
+        if c not in dedup:
+            dedup.append(c)
+    return dedup
+
+
+def _variant(rng: random.Random, sha: str) -> tuple[str, str]:
+    """返回 (附言中的 SHA 写法, 种类)"""
+    prefix = sha[: rng.randint(7, 12)]
+    kind = rng.choice(["plain", "upper", "fullwidth", "spaced", "dashed", "glued", "full"])
+    if kind == "upper":
+        return prefix.upper(), kind
+    if kind == "fullwidth":
+        return "".join(_FULLWIDTH.get(c, c) for c in prefix), kind
+    if kind == "spaced":
+        cut = rng.randint(3, len(prefix) - 3)
+        return prefix[:cut] + " " + prefix[cut:], kind
+    if kind == "dashed":
+        return "-".join(prefix[i: i + 4] for i in range(0, len(prefix), 4)), kind
+    if kind == "full":
+        return sha, kind
+    return prefix, kind
+
+
+def make_comment(rng: random.Random, sha: str) -> tuple[str, str]:
+    written, kind = _variant(rng, sha)
+    if kind == "glued":
+        return f"{rng.choice(_FILLERS)}{written}{rng.choice(['哦', '吗', '', '呀'])}", kind
+    return f"{rng.choice(_FILLERS)} {written} {rng.choice(_FILLERS)}".strip(), kind
+
+
+def _accepts(candidates: List[str], sha: str) -> bool:
+    return any(len(c) >= 7 and sha.startswith(c) for c in candidates)
+
+
+def _time(fn: Callable[[str], List[str]], inputs: List[str]) -> float:
+    start = time.perf_counter()
+    for text in inputs:
+        fn(text)
+    return time.perf_counter() - start
+
+
+def _random_text(rng: random.Random, n: int) -> str:
+    alphabet = "0123456789abcdefABCDEFghxyz -_:.，。你好提交　​" + "".join(_FULLWIDTH.values())
+    return "".join(rng.choice(alphabet) for _ in range(n))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SHA 候选提取模糊测试与基准")
+    parser.add_argument("--comments", type=int, default=20000)
+    parser.add_argument("--fuzz", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    extractor = ShaCandidateExtractor()
+
+    # 识别率
+    by_kind = {}
+    comments = []
+    comments_by_kind = {}
+    for i in range(args.comments):
+        sha = hashlib.sha1(f"commit-{i}".encode()).hexdigest()
+        comment, kind = make_comment(rng, sha)
+        comments.append(comment)
+        comments_by_kind.setdefault(kind, []).append(comment)
+        stat = by_kind.setdefault(kind, [0, 0, 0])
+        stat[0] += 1
+        stat[1] += _accepts(old_extract(comment), sha)
+        stat[2] += _accepts(extractor.extract(comment), sha)
+    print(f"{'写法':<10} {'数量':>6} {'旧识别率':>9} {'新识别率':>9}")
+    for kind, (n, old_ok, new_ok) in sorted(by_kind.items()):
+        print(f"{kind:<10} {n:>6} {old_ok / n:>9.1%} {new_ok / n:>9.1%}")
+
+    # 模糊测试：候选必须是 7~40 位小写十六进制、无重复，且不抛异常
+    hex_re = re.compile(r"[0-9a-f]{7,40}")
+    for _ in range(args.fuzz):
+        text = _random_text(rng, rng.randint(0, 200))
+        candidates = extractor.extract(text)
+        assert len(candidates) == len(set(candidates)), text
+        assert all(hex_re.fullmatch(c) for c in candidates), (text, candidates)
+    print(f"模糊测试 {args.fuzz} 条通过")
+
+    # 性能
+    old_t = _time(old_extract, comments)
+    new_t = _time(extractor.extract, comments)
+    print(f"普通附言: 旧 {old_t / len(comments) * 1e6:.2f} µs/条, 新 {new_t / len(comments) * 1e6:.2f} µs/条")
+    for kind, texts in sorted(comments_by_kind.items()):
+        old_t = _time(old_extract, texts)
+        new_t = _time(extractor.extract, texts)
+        print(f"  {kind:<10} 旧 {old_t / len(texts) * 1e6:.2f} µs/条, 新 {new_t / len(texts) * 1e6:.2f} µs/条")
+
+    hostile = [" ".join(f"{i:07x}" for i in range(n)) for n in (1000, 5000, 20000)]
+    for text in hostile:
+        old_t = _time(old_extract, [text])
+        new_t = _time(extractor.extract, [text])
+        print(f"恶意输入 {len(text):>7} 字符: 旧 {old_t * 1000:9.2f} ms, 新 {new_t * 1000:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""插件启动耗时基准。
+
+在临时数据目录中生成大量遗留的待审请求（其中一部分已过期）与历史日期的错误次数，
+对比：
+  - 旧方式：在事件循环中 json.load 全部文件后 initialize 才返回；
+  - 新方式：initialize 立即返回，状态在线程中加载并压缩，统计事件循环最长阻塞时间、
+    就绪用时与压缩前后的文件大小。
+
+    python benchmarks/bench_startup.py --pending 200000 --expired-ratio 0.5 --error-counts 200000
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(ROOT))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_review import _load_plugin_module  # noqa: E402
+
+
+def _write_state(data_dir: str, pending: int, expired_ratio: float, error_counts: int, today: str) -> None:
+    now = int(time.time())
+    expired = int(pending * expired_ratio)
+    data = {}
+    for i in range(pending):
+        ts = now - 7 * 86400 if i < expired else now - 60
+        data.setdefault(str(100000 + i % 500), {})[str(10_000_000 + i)] = {
+            "flag": f"flag-{i}", "sub_type": "add", "comment": f"提交号 {i:08x}", "ts": ts,
+        }
+    with open(os.path.join(data_dir, "pending_group_requests.json"), "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+    counts = {}
+    for i in range(error_counts):
+        date = today if i % 10 == 0 else "2020-01-01"
+        counts.setdefault(str(100000 + i % 500), {})[str(20_000_000 + i)] = {date: 1 + i % 3}
+    with open(os.path.join(data_dir, "error_counts.json"), "w", encoding="utf-8") as f:
+        json.dump(counts, f)
+
+
+def _sizes(data_dir: str) -> str:
+    return ", ".join(
+        f"{name} {os.path.getsize(os.path.join(data_dir, name)) / 1e6:.1f}MB"
+        for name in ("pending_group_requests.json", "error_counts.json")
+    )
+
+
+async def _max_loop_lag(stop: asyncio.Event) -> float:
+    """事件循环中两次 1ms 定时器之间的最大间隔，即被阻塞的最长时间"""
+    worst = 0.0
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(0.001)
+        now = time.perf_counter()
+        worst = max(worst, now - last - 0.001)
+        last = now
+    return worst
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="astrbot_plugin_sha 启动耗时基准")
+    parser.add_argument("--pending", type=int, default=200000)
+    parser.add_argument("--expired-ratio", type=float, default=0.5)
+    parser.add_argument("--error-counts", type=int, default=200000)
+    args = parser.parse_args()
+
+    module = _load_plugin_module()
+    config = {"reset_hour": -1, "backlog_review_on_start": False}
+
+    # 旧方式：在事件循环中直接读取
+    plugin = module.GitHubShaPlugin(None, config)
+    _write_state(plugin._data_dir, args.pending, args.expired_ratio, args.error_counts, plugin._error_counts.date)
+    start = time.perf_counter()
+    for name in ("pending_group_requests.json", "error_counts.json"):
+        with open(os.path.join(plugin._data_dir, name), "r", encoding="utf-8") as f:
+            json.load(f)
+    print(f"旧: 事件循环中读取 JSON {(time.perf_counter() - start) * 1000:.0f}ms（期间事件循环完全阻塞）")
+
+    # 新方式
+    print(f"压缩前: {_sizes(plugin._data_dir)}")
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(_max_loop_lag(stop))
+    start = time.perf_counter()
+    await plugin.initialize()
+    init_ms = (time.perf_counter() - start) * 1000
+    await plugin._ready.wait()
+    ready_ms = (time.perf_counter() - start) * 1000
+    stop.set()
+    lag = await lag_task
+    print(
+        f"新: initialize 返回 {init_ms:.1f}ms，就绪 {ready_ms:.0f}ms，事件循环最长阻塞 {lag * 1000:.0f}ms，"
+        f"待审 {len(plugin._pending_cache)} 条，错误计数 {len(plugin._error_counts)} 条"
+    )
+    print(f"压缩后: {_sizes(plugin._data_dir)}")
+    await plugin.terminate()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
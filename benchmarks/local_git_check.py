@@ -0,0 +1,192 @@
+"""本地 git 镜像读取（LocalGitRepo）的离线检查。
+
+在临时目录中用 git 命令构建一个夹具仓库，覆盖 loose 对象、pack 中的对象（OFS_DELTA
+与 REF_DELTA 两种 delta）、packed-refs 与合并提交，再把 LocalGitRepo 的结果与
+git rev-list --first-parent 对比：
+  - recent_commits 返回的 SHA、父提交与提交时间一致（含 since 截断）；
+  - 新提交、pack-refs、repack 之后 ref_stamp 都会变化，重新读取的结果仍与 git 一致。
+
+只需要 git 命令，不需要 AstrBot 与网络：
+
+    python benchmarks/local_git_check.py --commits 120
+"""
+
+import os
+import sys
+import shutil
+import argparse
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(ROOT))
+
+local_git = __import__(f"{os.path.basename(ROOT)}.local_git", fromlist=["LocalGitRepo"])
+
+BASE_TS = 1_700_000_000
+
+
+class Fixture:
+    """用 git 命令操作夹具仓库，提交时间按序号单调递增，便于对比 since"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.seq = 0
+        self.git("init", "-q", "-b", "main")
+
+    def git(self, *args: str, env: dict | None = None) -> str:
+        return subprocess.run(
+            ["git", "-C", self.path, *args],
+            check=True, capture_output=True, text=True,
+            env={**os.environ, **(env or {})},
+        ).stdout.strip()
+
+    def _env(self) -> dict:
+        self.seq += 1
+        date = f"@{BASE_TS + 3600 * self.seq} +0800"
+        return {
+            "GIT_AUTHOR_NAME": "fixture", "GIT_AUTHOR_EMAIL": "fixture@example.com", "GIT_AUTHOR_DATE": date,
+            "GIT_COMMITTER_NAME": "fixture", "GIT_COMMITTER_EMAIL": "fixture@example.com", "GIT_COMMITTER_DATE": date,
+        }
+
+    def commit(self, n: int) -> None:
+        """每个提交追加一行并带较长的相似提交说明，repack 时提交对象之间也会产生 delta"""
+        with open(os.path.join(self.path, "log.txt"), "a", encoding="utf-8") as f:
+            f.write(f"line {self.seq}\n")
+        self.git("add", "log.txt")
+        body = "\n".join(f"detail {i}: fixture commit body shared by all commits" for i in range(20))
+        self.git("commit", "-q", "-m", f"commit {n}\n\n{body}", env=self._env())
+
+    def merge_side(self, n: int) -> None:
+        """在侧分支提交后 --no-ff 合并回 main，侧分支的提交不应出现在第一父链上"""
+        self.git("checkout", "-q", "-b", f"side-{n}")
+        self.commit(n)
+        self.git("checkout", "-q", "main")
+        self.git("merge", "-q", "--no-ff", "-m", f"merge side-{n}", f"side-{n}", env=self._env())
+
+
+def rev_list(path: str, branch: str, count: int, since: str | None = None) -> list[str]:
+    args = ["git", "-C", path, "rev-list", "--first-parent", f"--max-count={count}"]
+    if since:
+        args.append(f"--since={since}")
+    return subprocess.run(args + [branch], check=True, capture_output=True, text=True).stdout.split()
+
+
+def compare(repo, path: str, branch: str, count: int, since: str | None = None) -> int:
+    commits = repo.recent_commits(branch, count, since=since)
+    expected = rev_list(path, branch, count, since)
+    got = [c["sha"] for c in commits]
+    assert got == expected, f"{branch} 提交不一致 (since={since}):\n  读取 {got[:5]}…\n  git  {expected[:5]}…"
+    for c in commits:
+        fmt = subprocess.run(
+            ["git", "-C", path, "show", "-s", "--format=%P%n%ct", c["sha"]],
+            check=True, capture_output=True, text=True,
+        ).stdout.split("\n")
+        parents, ct = fmt[0].split(), int(fmt[1])
+        assert c["parents"] == parents, f"{c['sha']} 父提交不一致"
+        date = datetime.fromtimestamp(ct, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        assert c["commit"]["committer"]["date"] == date, f"{c['sha']} 提交时间不一致"
+    return len(commits)
+
+
+def pack_stats(git_dir: str) -> tuple[int, int]:
+    """pack 中被存为 delta 的提交数量、loose 对象数量"""
+    deltas = 0
+    pack_dir = os.path.join(git_dir, "objects", "pack")
+    for name in os.listdir(pack_dir) if os.path.isdir(pack_dir) else []:
+        if name.endswith(".idx"):
+            out = subprocess.run(
+                ["git", "verify-pack", "-v", os.path.join(pack_dir, name)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            deltas += sum(1 for line in out.splitlines() if " commit " in line and len(line.split()) >= 7)
+    loose = subprocess.run(
+        ["git", "--git-dir", git_dir, "count-objects"], check=True, capture_output=True, text=True,
+    ).stdout.split()[0]
+    return deltas, int(loose)
+
+
+def check_repo(repo_path: str, label: str, count: int, delta_type: int | None = None) -> None:
+    repo = local_git.LocalGitRepo(repo_path)
+    # 记录从 pack 中读取的对象类型，确认确实走到了对应的 delta 分支
+    types: dict[int, int] = {}
+    read_pack_object = repo._read_pack_object
+
+    def _spy(f, offset):
+        f.seek(offset)
+        type_id = (f.read(1)[0] >> 4) & 0x07
+        types[type_id] = types.get(type_id, 0) + 1
+        return read_pack_object(f, offset)
+
+    repo._read_pack_object = _spy
+    since = datetime.fromtimestamp(BASE_TS + 3600 * 30, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    n = compare(repo, repo_path, "main", count)
+    compare(repo, repo_path, "main", count, since=since)
+    compare(repo, repo_path, "packed-only", count)
+    if delta_type is not None:
+        assert types.get(delta_type), f"{label} 中没有读取到类型 {delta_type} 的 delta 对象: {types}"
+    deltas, loose = pack_stats(repo.path)
+    print(f"{label}: 读取 {n} 条提交一致（pack 中 delta 提交 {deltas} 个，loose 对象 {loose} 个）")
+
+
+def main(args) -> None:
+    tmp = tempfile.mkdtemp(prefix="sha_local_git_")
+    try:
+        work = os.path.join(tmp, "work")
+        os.makedirs(work)
+        fx = Fixture(work)
+        half = args.commits // 2
+        for i in range(half):
+            fx.merge_side(i) if i % 10 == 9 else fx.commit(i)
+        # 前半段压缩进 pack（提交之间带 delta），并只在 packed-refs 中保留 packed-only 分支
+        fx.git("branch", "packed-only")
+        fx.git("repack", "-adf", "--window=50", "--depth=50")
+        fx.git("pack-refs", "--all")
+        for i in range(half, args.commits):
+            fx.commit(i)
+        git_dir = os.path.join(work, ".git")
+        check_repo(work, "工作仓库 (pack + loose + packed-refs)", args.commits)
+
+        # 镜像仓库：全部对象在 pack 中，分别使用 OFS_DELTA 与 REF_DELTA
+        for label, offset, delta_type in (
+            ("镜像 (OFS_DELTA)", "true", local_git._OBJ_OFS_DELTA),
+            ("镜像 (REF_DELTA)", "false", local_git._OBJ_REF_DELTA),
+        ):
+            mirror = os.path.join(tmp, f"mirror-{offset}.git")
+            subprocess.run(["git", "clone", "-q", "--mirror", work, mirror], check=True)
+            subprocess.run(
+                ["git", "-C", mirror, "-c", f"repack.useDeltaBaseOffset={offset}",
+                 "repack", "-adf", "--window=50", "--depth=50"],
+                check=True, capture_output=True,
+            )
+            check_repo(mirror, label, args.commits, delta_type)
+
+        # ref_stamp：引用变化后重新读取
+        repo = local_git.LocalGitRepo(work)
+        stamp = repo.ref_stamp("main")
+        fx.commit(args.commits)
+        assert repo.ref_stamp("main") != stamp, "新提交后 ref_stamp 未变化"
+        compare(repo, work, "main", 10)
+        stamp = repo.ref_stamp("main")
+        fx.git("pack-refs", "--all")
+        assert not os.path.exists(os.path.join(git_dir, "refs", "heads", "main")), "pack-refs 后仍有 loose 引用"
+        assert repo.ref_stamp("main") != stamp, "pack-refs 后 ref_stamp 未变化"
+        compare(repo, work, "main", 10)
+        fx.commit(args.commits + 1)
+        fx.git("repack", "-ad")
+        compare(repo, work, "main", args.commits)
+        print("ref_stamp: 新提交、pack-refs、repack 之后重新读取均与 git 一致")
+        print("检查通过")
+    finally:
+        if not args.keep:
+            shutil.rmtree(tmp, ignore_errors=True)
+        else:
+            print(f"夹具仓库保留在 {tmp}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="astrbot_plugin_sha 本地 git 镜像读取检查")
+    parser.add_argument("--commits", type=int, default=120)
+    parser.add_argument("--keep", action="store_true", help="保留临时夹具仓库")
+    main(parser.parse_args())
@@ -0,0 +1,116 @@
+"""多进程共享数据目录的一致性检查。
+
+启动一个本地假 GitHub，再启动 N 个独立进程加载插件、共享同一个临时数据目录：
+  - 每个进程分 rounds 轮获取提交列表，每轮间隔超过 commit_cache_ttl，
+    检查 GitHub 请求数约等于轮数而不是 进程数 × 轮数；
+  - 每个进程对同一个用户累加 increments 次错误次数，并各写入一条待审请求，
+    检查最终文件中的计数为 N × increments、待审请求一条不少。
+
+    python benchmarks/multiproc_check.py --procs 4 --rounds 3 --increments 50 --backend json
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(ROOT))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_review import FakeGitHub  # noqa: E402
+
+SHARED_GROUP = "100"
+SHARED_USER = "200"
+
+
+async def worker(args) -> None:
+    import importlib
+    from astrbot.api.star import StarTools
+
+    StarTools.get_data_dir = staticmethod(lambda name="astrbot_plugin_sha": args.data_dir)
+    module = importlib.import_module(f"{os.path.basename(ROOT)}.main")
+    plugin = module.GitHubShaPlugin(None, {
+        "github_api_base": args.github,
+        "commit_cache_ttl": 1,
+        "reset_hour": -1,
+        "storage_backend": args.backend,
+        "backlog_review_on_start": False,
+    })
+    await plugin.initialize()
+    await plugin._ready.wait()
+    per_round = args.increments // args.rounds
+    done = 0
+    for r in range(args.rounds):
+        commits = await plugin._get_recent_commits()
+        assert commits, "未获取到提交"
+        n = per_round if r < args.rounds - 1 else args.increments - done
+        for _ in range(n):
+            plugin._increment_error_count(SHARED_GROUP, SHARED_USER)
+            await asyncio.sleep(0.001)
+        done += n
+        await asyncio.sleep(1.2)
+    plugin._store.upsert_pending(SHARED_GROUP, f"proc-{args.index}", {
+        "flag": f"flag-{args.index}", "sub_type": "add", "comment": "", "ts": int(time.time()),
+    })
+    await plugin.terminate()
+    print(json.dumps({"index": args.index, "shared": (plugin._shared_commits.stats() if plugin._shared_commits else {})}))
+
+
+async def main(args) -> None:
+    data_dir = tempfile.mkdtemp(prefix="sha_multiproc_")
+    github = FakeGitHub(commit_total=50, latency_ms=args.github_latency_ms)
+    await github.start()
+    start = time.monotonic()
+    procs = [
+        await asyncio.create_subprocess_exec(
+            sys.executable, os.path.abspath(__file__), "--worker",
+            "--index", str(i), "--data-dir", data_dir, "--github", github.base_url,
+            "--rounds", str(args.rounds), "--increments", str(args.increments), "--backend", args.backend,
+            stdout=asyncio.subprocess.PIPE,
+        )
+        for i in range(args.procs)
+    ]
+    outputs = [await p.communicate() for p in procs]
+    elapsed = time.monotonic() - start
+    await github.stop()
+    assert all(p.returncode == 0 for p in procs), "有进程异常退出"
+    for out, _ in outputs:
+        print(out.decode().strip().splitlines()[-1])
+
+    module = __import__(f"{os.path.basename(ROOT)}.storage", fromlist=["create_state_store"])
+    store = module.create_state_store(args.backend, data_dir)
+    await store.open()
+    errors, _, _ = await store.load_error_count_state(datetime.now().strftime("%Y-%m-%d"))
+    pending, _, _ = await store.load_pending_state(0)
+    await store.close()
+
+    total = sum((errors.get(SHARED_GROUP, {}).get(SHARED_USER) or {}).values())
+    expected = args.procs * args.increments
+    pending_users = set(pending.get(SHARED_GROUP, {}))
+    print(f"进程 {args.procs}，轮数 {args.rounds}，用时 {elapsed:.1f} 秒")
+    print(f"GitHub 请求: {github.calls}（不共享时约 {args.procs * args.rounds}）")
+    print(f"错误次数: {total}，期望 {expected}")
+    print(f"待审请求: {len(pending_users)}，期望 {args.procs}")
+    assert total == expected, "错误次数丢失"
+    assert pending_users == {f"proc-{i}" for i in range(args.procs)}, "待审请求丢失"
+    print("检查通过")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="astrbot_plugin_sha 多进程一致性检查")
+    parser.add_argument("--procs", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--increments", type=int, default=50)
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--github-latency-ms", type=float, default=100)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--index", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--data-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--github", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    asyncio.run(worker(args) if args.worker else main(args))
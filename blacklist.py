@@ -0,0 +1,62 @@
+import time
+import asyncio
+from typing import Dict, FrozenSet, Iterable
+
+from astrbot.api import logger
+
+from .storage import StateStore
+
+
+class BlacklistIndex:
+    """黑名单（reject_ids）的内存索引。
+
+    数据只在存储的版本标记变化时重新读取（JSON 后端为 group_join_data.json 的
+    mtime/大小），读取与解析不在事件循环中进行；查询是对每群 frozenset 的 O(1) 成员判断。
+    """
+
+    def __init__(self, store: StateStore, check_interval: float = 5.0):
+        self.store = store
+        self.check_interval = float(check_interval)
+        self._index: Dict[str, FrozenSet[str]] = {}
+        self._stamp = None
+        self._loaded = False
+        self._last_check = 0.0
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _build(reject_ids: Dict[str, Iterable[str]]) -> Dict[str, FrozenSet[str]]:
+        return {
+            str(group_id): frozenset(str(x) for x in (users or []))
+            for group_id, users in reject_ids.items()
+        }
+
+    async def reload(self, force: bool = True) -> bool:
+        """重新加载黑名单；force=False 时仅在数据变化后才读取。返回是否发生了重新加载。"""
+        async with self._lock:
+            self._last_check = time.monotonic()
+            try:
+                stamp = await self.store.blacklist_stamp()
+                if not force and self._loaded and stamp == self._stamp:
+                    return False
+                reject_ids = await self.store.load_blacklist()
+            except Exception as e:
+                logger.error(f"[审阅加群] 读取黑名单失败: {e}")
+                return False
+            self._index = self._build(reject_ids)
+            self._stamp = stamp
+            self._loaded = True
+            logger.debug(
+                f"[审阅加群] 黑名单已加载: {len(self._index)} 个群, "
+                f"{sum(len(v) for v in self._index.values())} 条记录"
+            )
+            return True
+
+    async def refresh_if_changed(self) -> None:
+        """距上次检查超过 check_interval 时检查数据是否变化"""
+        if time.monotonic() - self._last_check < self.check_interval:
+            return
+        await self.reload(force=False)
+
+    def contains(self, group_id: str, user_id: str) -> bool:
+        users = self._index.get(str(group_id))
+        return users is not None and str(user_id) in users
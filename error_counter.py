@@ -0,0 +1,125 @@
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Hashable
+
+from .ids import pair_key, split_pair_key
+
+
+class DailyErrorCounter:
+    """按自然日统计的错误次数，键为打包后的 (group_id, user_id)（见 ids.pair_key）。
+
+    每条记录带有所属日期的“代”（date.toordinal()），查询时代不一致即视为 0，
+    因此日期切换无需重建数据，重置只是推进当前代；旧代记录在访问或写入时惰性清理。
+    max_entries > 0 时超出上限按 LRU 淘汰最久未更新的记录。
+    """
+
+    # 每次写入时顺带检查并清理的旧记录数量
+    SWEEP_PER_WRITE = 4
+
+    def __init__(self, max_entries: int = 0):
+        self.max_entries = max(0, int(max_entries))
+        self._counts: "OrderedDict[Hashable, tuple[int, int]]" = OrderedDict()
+        self._gen = 0
+        self._date = ""
+        self._day_end = 0.0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def _refresh_day(self) -> None:
+        now = time.time()
+        if now < self._day_end:
+            return
+        today = datetime.fromtimestamp(now).date()
+        self._gen = today.toordinal()
+        self._date = today.strftime("%Y-%m-%d")
+        tomorrow = datetime.combine(today + timedelta(days=1), datetime.min.time())
+        self._day_end = tomorrow.timestamp()
+
+    @property
+    def generation(self) -> int:
+        self._refresh_day()
+        return self._gen
+
+    @property
+    def date(self) -> str:
+        """当前代对应的日期字符串 (YYYY-MM-DD)"""
+        self._refresh_day()
+        return self._date
+
+    def get(self, group_id, user_id) -> int:
+        key = pair_key(group_id, user_id)
+        entry = self._counts.get(key)
+        if entry is None:
+            return 0
+        if entry[0] != self.generation:
+            del self._counts[key]
+            return 0
+        return entry[1]
+
+    def increment(self, group_id, user_id) -> int:
+        gen = self.generation
+        key = pair_key(group_id, user_id)
+        entry = self._counts.get(key)
+        count = entry[1] + 1 if entry is not None and entry[0] == gen else 1
+        self._counts[key] = (gen, count)
+        self._counts.move_to_end(key)
+        self._sweep(gen)
+        return count
+
+    def _sweep(self, gen: int) -> None:
+        # 最久未更新的记录在最前面，旧代记录会逐步被清理
+        for _ in range(self.SWEEP_PER_WRITE):
+            if not self._counts:
+                break
+            key, entry = next(iter(self._counts.items()))
+            if entry[0] == gen:
+                break
+            del self._counts[key]
+        if self.max_entries:
+            while len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+                self.evicted += 1
+
+    def reset(self) -> None:
+        """推进到当前日期对应的代，O(1)；旧记录惰性清理"""
+        self._day_end = 0.0
+        self._refresh_day()
+
+    def load(self, data: Dict[str, Dict[str, Dict[str, int]]]) -> int:
+        """从 JSON 结构加载，只保留今天的记录，返回丢弃的旧记录数"""
+        self._counts.clear()
+        gen, today = self.generation, self.date
+        dropped = 0
+        for group_id, users in (data or {}).items():
+            for user_id, dates in (users or {}).items():
+                for date, count in (dates or {}).items():
+                    if date == today:
+                        self._counts[pair_key(group_id, user_id)] = (gen, int(count))
+                    else:
+                        dropped += 1
+        return dropped
+
+    def merge(self, data: Dict[str, Dict[str, Dict[str, int]]]) -> None:
+        """用存储中的计数覆盖今天对应键的计数（其他进程的累加），不清除未出现的键"""
+        gen, today = self.generation, self.date
+        for group_id, users in (data or {}).items():
+            for user_id, dates in (users or {}).items():
+                count = (dates or {}).get(today)
+                if count is None:
+                    continue
+                key = pair_key(group_id, user_id)
+                self._counts[key] = (gen, int(count))
+                self._counts.move_to_end(key)
+        self._sweep(gen)
+
+    def to_json(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        gen, today = self.generation, self.date
+        data: Dict[str, Dict[str, Dict[str, int]]] = {}
+        for key, (entry_gen, count) in self._counts.items():
+            if entry_gen == gen:
+                group_id, user_id = split_pair_key(key)
+                data.setdefault(str(group_id), {})[str(user_id)] = {today: count}
+        return data
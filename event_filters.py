@@ -0,0 +1,41 @@
+import re
+
+from astrbot.api import AstrBotConfig
+from astrbot.api.event import AstrMessageEvent
+from astrbot.api.event.filter import CustomFilter
+
+# 与原 @filter.regex(r"(?i)\bhash\b") 的匹配方式一致：AstrBot 对去除首尾空白后的消息做 re.match
+HASH_KEYWORD_RE = re.compile(r"\s*hash\b", re.IGNORECASE)
+
+
+def has_hash_keyword(text: str) -> bool:
+    # 只有首个字符为 h/H（或空白）的消息才可能命中，绝大多数聊天消息无需进入正则引擎
+    if not text:
+        return False
+    first = text[0]
+    if first != "h" and first != "H" and not first.isspace():
+        return False
+    return HASH_KEYWORD_RE.match(text) is not None
+
+
+class ReviewEventFilter(CustomFilter):
+    """在事件分发阶段同步过滤，普通聊天消息不会进入 capture_group_add_requests，
+    也不会因为该处理器而被标记为唤醒"""
+
+    def filter(self, event: AstrMessageEvent, cfg: AstrBotConfig) -> bool:
+        raw = getattr(event.message_obj, "raw_message", None)
+        if not isinstance(raw, dict):
+            return False
+        post_type = raw.get("post_type")
+        if post_type == "request":
+            return raw.get("request_type") == "group"
+        if post_type == "notice":
+            return raw.get("notice_type") == "group_admin"
+        return False
+
+
+class HashKeywordFilter(CustomFilter):
+    """hash 关键词触发：预编译正则，并先做一次廉价的首字符预检"""
+
+    def filter(self, event: AstrMessageEvent, cfg: AstrBotConfig) -> bool:
+        return has_hash_keyword(event.message_str)
@@ -0,0 +1,333 @@
+import ssl
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any
+
+import aiohttp
+import certifi
+
+from astrbot.api import logger
+
+
+class GitHubAPIError(RuntimeError):
+    """GitHub API 返回非 200 状态码"""
+
+    def __init__(self, status: int, message: str = ""):
+        self.status = status
+        super().__init__(message or f"GitHub API 请求失败，状态码: {status}")
+
+
+class GitHubRateLimitError(GitHubAPIError):
+    """速率配额耗尽或熔断器打开，请求未发出"""
+
+    def __init__(self, retry_at: float, message: str = ""):
+        self.retry_at = retry_at
+        wait = max(0, int(retry_at - time.time()))
+        super().__init__(429, message or f"GitHub API 暂不可用，约 {wait} 秒后重试")
+
+
+class RateLimitState:
+    """从 X-RateLimit-* / Retry-After 响应头得到的配额状态"""
+
+    __slots__ = ("limit", "remaining", "reset_at", "blocked_until")
+
+    def __init__(self):
+        self.limit: int | None = None
+        self.remaining: int | None = None
+        self.reset_at = 0.0
+        self.blocked_until = 0.0
+
+
+class CircuitBreaker:
+    """连续失败达到阈值后打开，冷却期内直接拒绝请求；冷却时间随连续打开次数翻倍"""
+
+    def __init__(self, threshold: int = 3, cooldown: float = 30.0, max_cooldown: float = 600.0):
+        self.threshold = max(1, int(threshold))
+        self.cooldown = float(cooldown)
+        self.max_cooldown = float(max_cooldown)
+        self.failures = 0
+        self.trips = 0
+        self.open_until = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return time.time() < self.open_until
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.trips = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.trip(time.time() + min(self.max_cooldown, self.cooldown * (2 ** self.trips)))
+
+    def trip(self, until: float) -> None:
+        self.open_until = max(self.open_until, until)
+        self.trips += 1
+        self.failures = 0
+
+
+class GitHubClient:
+    """插件生命周期内共享的 GitHub HTTP 客户端。
+
+    在 initialize 中创建、terminate 中关闭，所有访问 GitHub 的代码路径复用同一个
+    ClientSession，从而复用 keep-alive 连接、DNS 缓存与 SSL 上下文。
+    """
+
+    API_BASE = "https://api.github.com"
+    MAX_PER_PAGE = 100
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        timeout: float = 10.0,
+        connect_timeout: float = 5.0,
+        dns_ttl: int = 300,
+        keepalive_timeout: float = 60.0,
+        token: str = "",
+        api_base: str = "",
+    ):
+        self.api_base = (api_base or self.API_BASE).rstrip("/")
+        self._token = (token or "").strip()
+        self._pool_size = max(1, int(pool_size))
+        self._timeout = aiohttp.ClientTimeout(
+            total=float(timeout), connect=float(connect_timeout)
+        )
+        self._dns_ttl = int(dns_ttl)
+        self._keepalive_timeout = float(keepalive_timeout)
+        self._session: aiohttp.ClientSession | None = None
+        self._closed = False
+        self._lock = asyncio.Lock()
+        # 按 X-RateLimit-Resource（core / graphql ...）分别记录配额
+        self.rate_limits: Dict[str, RateLimitState] = {}
+        self.breaker = CircuitBreaker()
+        # 配额低于该值时暂停后台请求直到重置，余量留给 /sha 等即时请求（priority=True）
+        self.reserve = 2
+        self.status_counts: Dict[int, int] = {}
+
+    async def start(self) -> None:
+        """创建共享会话（重复调用无副作用）"""
+        async with self._lock:
+            if self._closed:
+                # 等待锁期间客户端可能已被关闭
+                raise RuntimeError("GitHub 客户端已关闭")
+            if self._session is not None and not self._session.closed:
+                return
+            ssl_ctx = ssl.create_default_context(cafile=certifi.where())
+            connector = aiohttp.TCPConnector(
+                ssl=ssl_ctx,
+                limit=self._pool_size,
+                limit_per_host=self._pool_size,
+                ttl_dns_cache=self._dns_ttl,
+                use_dns_cache=True,
+                keepalive_timeout=self._keepalive_timeout,
+            )
+            headers = {
+                "Accept": "application/vnd.github+json",
+                "User-Agent": "astrbot_plugin_sha",
+            }
+            if self._token:
+                headers["Authorization"] = f"Bearer {self._token}"
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self._timeout,
+                headers=headers,
+            )
+            logger.debug(
+                f"[GitHub] 已创建共享 HTTP 会话 (pool={self._pool_size}, dns_ttl={self._dns_ttl}s)"
+            )
+
+    @property
+    def has_token(self) -> bool:
+        return bool(self._token)
+
+    async def close(self) -> None:
+        """关闭会话；之后的请求直接失败，不会再创建新会话"""
+        async with self._lock:
+            self._closed = True
+            if self._session is not None and not self._session.closed:
+                await self._session.close()
+            self._session = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._closed:
+            raise RuntimeError("GitHub 客户端已关闭")
+        if self._session is None or self._session.closed:
+            await self.start()
+        return self._session
+
+    def _rate_state(self, resource: str) -> RateLimitState:
+        state = self.rate_limits.get(resource)
+        if state is None:
+            state = self.rate_limits[resource] = RateLimitState()
+        return state
+
+    def _check_budget(self, resource: str, priority: bool = False) -> None:
+        now = time.time()
+        state = self._rate_state(resource)
+        if now < state.blocked_until:
+            raise GitHubRateLimitError(state.blocked_until)
+        if (
+            state.remaining is not None
+            and state.remaining <= (0 if priority else self.reserve)
+            and now < state.reset_at
+        ):
+            raise GitHubRateLimitError(state.reset_at, "GitHub API 配额即将耗尽，等待重置")
+        if self.breaker.is_open:
+            raise GitHubRateLimitError(self.breaker.open_until, "GitHub API 连续失败，暂停请求")
+
+    def _record_response(self, response: aiohttp.ClientResponse, default_resource: str) -> None:
+        headers = response.headers
+        status = response.status
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        state = self._rate_state(headers.get("X-RateLimit-Resource", default_resource))
+        try:
+            if "X-RateLimit-Limit" in headers:
+                state.limit = int(headers["X-RateLimit-Limit"])
+            if "X-RateLimit-Remaining" in headers:
+                state.remaining = int(headers["X-RateLimit-Remaining"])
+            if "X-RateLimit-Reset" in headers:
+                state.reset_at = float(headers["X-RateLimit-Reset"])
+        except ValueError:
+            pass
+
+        if status in (403, 429) and (
+            "Retry-After" in headers or state.remaining == 0
+        ):
+            # 主/次级速率限制：等到 Retry-After 或配额重置
+            retry_at = state.reset_at
+            try:
+                retry_at = max(retry_at, time.time() + float(headers.get("Retry-After", 0)))
+            except ValueError:
+                pass
+            retry_at = max(retry_at, time.time() + 60)
+            state.blocked_until = retry_at
+            self.breaker.trip(retry_at)
+            logger.warning(
+                f"[GitHub] 触发速率限制 (status={status})，暂停请求约 {int(retry_at - time.time())} 秒"
+            )
+        elif status >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    @asynccontextmanager
+    async def _request(self, method: str, url: str, resource: str, priority: bool = False, **kwargs):
+        """发出请求前检查配额与熔断状态，并根据响应头更新配额；priority 请求可以使用预留配额"""
+        self._check_budget(resource, priority)
+        session = await self._get_session()
+        try:
+            async with session.request(method, url, **kwargs) as response:
+                self._record_response(response, resource)
+                yield response
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self.breaker.record_failure()
+            raise
+
+    def suggested_interval(self, calls_per_refresh: int = 1, resource: str = "core") -> float:
+        """按剩余配额估算两次刷新之间至少需要间隔的秒数，确保重置前不会用尽配额"""
+        state = self.rate_limits.get(resource)
+        if state is None or state.remaining is None:
+            return 0.0
+        window = state.reset_at - time.time()
+        if window <= 0:
+            return 0.0
+        budget = max(1, state.remaining - self.reserve)
+        return window * max(1, calls_per_refresh) / budget
+
+    async def fetch_commits_conditional(
+        self,
+        repo: str,
+        branch: str,
+        per_page: int,
+        etag: str | None = None,
+        page: int = 1,
+        since: str | None = None,
+        priority: bool = False,
+    ) -> tuple[List[Dict[str, Any]] | None, str | None]:
+        """带 If-None-Match 的条件请求。
+
+        返回 (commits, etag)；服务端返回 304 时 commits 为 None，表示缓存仍然有效，
+        且该请求不计入 GitHub 速率配额。per_page 最大为 100，更多提交需要翻页。
+        priority 为用户即时请求，配额只剩预留部分时仍可发出。
+        """
+        url = f"{self.api_base}/repos/{repo}/commits"
+        params: Dict[str, Any] = {"sha": branch, "per_page": min(int(per_page), self.MAX_PER_PAGE)}
+        if page > 1:
+            params["page"] = page
+        if since:
+            params["since"] = since
+        headers = {"If-None-Match": etag} if etag else None
+        async with self._request("GET", url, "core", priority, params=params, headers=headers) as response:
+            if response.status == 304:
+                return None, etag
+            if response.status != 200:
+                raise GitHubAPIError(response.status)
+            return await response.json(), response.headers.get("ETag")
+
+    async def fetch_commits_batch(
+        self, targets: List[tuple[str, str, int, str | None]]
+    ) -> List[List[Dict[str, Any]] | None]:
+        """通过一次 GraphQL 查询批量获取多个仓库分支的最近提交（需要 Token）。
+
+        targets 为 (repo, branch, 数量, since) 列表，返回值与 targets 一一对应；
+        仓库或分支不存在时对应位置为 None。每个提交只选取 oid、标题、作者和日期，
+        并转换为与 REST 接口相同的结构。
+        """
+        if not self._token:
+            raise GitHubAPIError(401, "GraphQL 批量查询需要配置 GitHub Token")
+        if not targets:
+            return []
+
+        var_defs: List[str] = []
+        fields: List[str] = []
+        variables: Dict[str, Any] = {}
+        for i, (repo, branch, first, since) in enumerate(targets):
+            owner, _, name = repo.partition("/")
+            var_defs.append(f"$o{i}: String!, $n{i}: String!, $b{i}: String!, $s{i}: GitTimestamp")
+            fields.append(
+                f"r{i}: repository(owner: $o{i}, name: $n{i}) {{"
+                f" ref(qualifiedName: $b{i}) {{ target {{ ... on Commit {{"
+                f" history(first: {min(int(first), self.MAX_PER_PAGE)}, since: $s{i}) {{"
+                " nodes { oid messageHeadline committedDate author { name date } }"
+                " } } } } }"
+            )
+            variables.update({f"o{i}": owner, f"n{i}": name, f"b{i}": branch, f"s{i}": since})
+        query = f"query({', '.join(var_defs)}) {{ {' '.join(fields)} }}"
+
+        async with self._request(
+            "POST", f"{self.api_base}/graphql", "graphql",
+            json={"query": query, "variables": variables},
+        ) as response:
+            if response.status != 200:
+                raise GitHubAPIError(response.status)
+            payload = await response.json()
+
+        data = payload.get("data") or {}
+        if not data and payload.get("errors"):
+            raise GitHubAPIError(200, f"GitHub GraphQL 查询失败: {payload['errors'][0].get('message', '')}")
+
+        results: List[List[Dict[str, Any]] | None] = []
+        for i in range(len(targets)):
+            try:
+                nodes = data[f"r{i}"]["ref"]["target"]["history"]["nodes"]
+            except (KeyError, TypeError):
+                results.append(None)
+                continue
+            results.append([
+                {
+                    "sha": n["oid"],
+                    "commit": {
+                        "message": n.get("messageHeadline") or "",
+                        "author": {
+                            "name": (n.get("author") or {}).get("name") or "",
+                            "date": (n.get("author") or {}).get("date") or n.get("committedDate") or "",
+                        },
+                        "committer": {"date": n.get("committedDate") or ""},
+                    },
+                }
+                for n in nodes
+            ])
+        return results
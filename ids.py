@@ -0,0 +1,28 @@
+from typing import Hashable
+
+# 群号与 QQ 号打包成一个 int 作为内存中的键：QQ 号占低 40 位
+_USER_BITS = 40
+_USER_MASK = (1 << _USER_BITS) - 1
+
+
+def id_key(value) -> Hashable:
+    """QQ 号/群号统一转为 int，非数字的 ID 保留为字符串"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def pair_key(group_id, user_id) -> Hashable:
+    """(群号, QQ 号) 的紧凑键：都是非负整数时为一个 int，否则退回为元组"""
+    g, u = id_key(group_id), id_key(user_id)
+    if type(g) is int and type(u) is int and g >= 0 and 0 <= u <= _USER_MASK:
+        return g << _USER_BITS | u
+    return (g, u)
+
+
+def split_pair_key(key: Hashable) -> tuple:
+    """pair_key 的逆运算，返回 (群号, QQ 号)"""
+    if type(key) is int:
+        return key >> _USER_BITS, key & _USER_MASK
+    return key
@@ -0,0 +1,269 @@
+import os
+import zlib
+import struct
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+_OBJ_COMMIT = 1
+_OBJ_OFS_DELTA = 6
+_OBJ_REF_DELTA = 7
+_TYPE_NAMES = {1: "commit", 2: "tree", 3: "blob", 4: "tag"}
+
+
+class LocalGitError(RuntimeError):
+    pass
+
+
+def _read_varint_size(data: bytes, pos: int) -> tuple[int, int]:
+    """delta 头部中的小端变长整数"""
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return result, pos
+
+
+def _apply_delta(base: bytes, delta: bytes) -> bytes:
+    src_size, pos = _read_varint_size(delta, 0)
+    dst_size, pos = _read_varint_size(delta, pos)
+    if src_size != len(base):
+        raise LocalGitError("delta 基对象长度不匹配")
+    out = bytearray()
+    while pos < len(delta):
+        op = delta[pos]
+        pos += 1
+        if op & 0x80:
+            offset = size = 0
+            for i in range(4):
+                if op & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if op & (1 << (4 + i)):
+                    size |= delta[pos] << (8 * i)
+                    pos += 1
+            out += base[offset: offset + (size or 0x10000)]
+        elif op:
+            out += delta[pos: pos + op]
+            pos += op
+        else:
+            raise LocalGitError("无效的 delta 指令")
+    if len(out) != dst_size:
+        raise LocalGitError("delta 结果长度不匹配")
+    return bytes(out)
+
+
+class _PackIndex:
+    """pack .idx (v2) 文件，按 fanout 表 + 二分查找对象偏移"""
+
+    def __init__(self, idx_path: str):
+        with open(idx_path, "rb") as f:
+            data = f.read()
+        if data[:4] != b"\xfftOc" or struct.unpack(">I", data[4:8])[0] != 2:
+            raise LocalGitError(f"不支持的 pack 索引格式: {idx_path}")
+        self._data = data
+        self._fanout = struct.unpack(">256I", data[8: 8 + 1024])
+        self.count = self._fanout[255]
+        self._sha_base = 8 + 1024
+        self._offset_base = self._sha_base + 24 * self.count  # sha(20) + crc(4)
+        self._large_base = self._offset_base + 4 * self.count
+        self.pack_path = idx_path[:-4] + ".pack"
+
+    def find(self, sha: bytes) -> int | None:
+        first = sha[0]
+        lo = self._fanout[first - 1] if first else 0
+        hi = self._fanout[first]
+        data, base = self._data, self._sha_base
+        while lo < hi:
+            mid = (lo + hi) // 2
+            cur = data[base + 20 * mid: base + 20 * mid + 20]
+            if cur < sha:
+                lo = mid + 1
+            elif cur > sha:
+                hi = mid
+            else:
+                offset = struct.unpack(">I", data[self._offset_base + 4 * mid: self._offset_base + 4 * mid + 4])[0]
+                if offset & 0x80000000:
+                    pos = self._large_base + 8 * (offset & 0x7FFFFFFF)
+                    offset = struct.unpack(">Q", data[pos: pos + 8])[0]
+                return offset
+        return None
+
+
+class LocalGitRepo:
+    """只读访问本地裸仓库/镜像仓库，不依赖 git 命令。
+
+    支持 loose / packed-refs 引用，以及 loose 对象和 pack 中（含 delta）的提交对象；
+    提交沿第一父提交向前遍历，结果转换为与 GitHub REST 接口相同的结构。
+    """
+
+    def __init__(self, path: str):
+        path = os.path.abspath(os.path.expanduser(path))
+        if os.path.isdir(os.path.join(path, ".git")):
+            path = os.path.join(path, ".git")
+        if not os.path.isdir(os.path.join(path, "objects")):
+            raise LocalGitError(f"不是有效的 git 仓库: {path}")
+        self.path = path
+        self._packs: List[_PackIndex] = []
+        self._packs_stamp = None
+
+    # ---- 引用 ----
+
+    def _ref_paths(self, branch: str) -> List[str]:
+        if branch.startswith("refs/"):
+            return [branch]
+        return [f"refs/heads/{branch}", f"refs/remotes/origin/{branch}"]
+
+    def ref_stamp(self, branch: str) -> tuple:
+        """引用文件与 packed-refs 的修改时间，用于判断是否需要重新读取"""
+        stamp = []
+        for name in self._ref_paths(branch) + ["packed-refs"]:
+            try:
+                st = os.stat(os.path.join(self.path, name))
+                stamp.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def resolve_ref(self, branch: str) -> str:
+        names = self._ref_paths(branch)
+        for name in names:
+            ref_file = os.path.join(self.path, name)
+            if os.path.isfile(ref_file):
+                with open(ref_file, "r", encoding="utf-8") as f:
+                    value = f.read().strip()
+                if value.startswith("ref: "):
+                    return self.resolve_ref(value[5:])
+                return value
+        packed = os.path.join(self.path, "packed-refs")
+        if os.path.isfile(packed):
+            with open(packed, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.startswith(("#", "^")):
+                        continue
+                    parts = line.strip().split(" ", 1)
+                    if len(parts) == 2 and parts[1] in names:
+                        return parts[0]
+        raise LocalGitError(f"找不到分支: {branch}")
+
+    # ---- 对象 ----
+
+    def _load_packs(self) -> List[_PackIndex]:
+        pack_dir = os.path.join(self.path, "objects", "pack")
+        try:
+            names = sorted(n for n in os.listdir(pack_dir) if n.endswith(".idx"))
+        except FileNotFoundError:
+            names = []
+        if names != self._packs_stamp:
+            self._packs = [_PackIndex(os.path.join(pack_dir, n)) for n in names]
+            self._packs_stamp = names
+        return self._packs
+
+    def read_object(self, sha: str) -> tuple[str, bytes]:
+        loose = os.path.join(self.path, "objects", sha[:2], sha[2:])
+        if os.path.isfile(loose):
+            with open(loose, "rb") as f:
+                raw = zlib.decompress(f.read())
+            header, _, body = raw.partition(b"\x00")
+            return header.split(b" ", 1)[0].decode(), body
+
+        sha_bytes = bytes.fromhex(sha)
+        for pack in self._load_packs():
+            offset = pack.find(sha_bytes)
+            if offset is not None:
+                with open(pack.pack_path, "rb") as f:
+                    type_id, body = self._read_pack_object(f, offset)
+                return _TYPE_NAMES[type_id], body
+        raise LocalGitError(f"找不到对象: {sha}")
+
+    def _read_pack_object(self, f, offset: int) -> tuple[int, bytes]:
+        f.seek(offset)
+        byte = f.read(1)[0]
+        type_id = (byte >> 4) & 0x07
+        size = byte & 0x0F
+        shift = 4
+        while byte & 0x80:
+            byte = f.read(1)[0]
+            size |= (byte & 0x7F) << shift
+            shift += 7
+
+        if type_id == _OBJ_OFS_DELTA:
+            byte = f.read(1)[0]
+            rel = byte & 0x7F
+            while byte & 0x80:
+                byte = f.read(1)[0]
+                rel = ((rel + 1) << 7) | (byte & 0x7F)
+            delta = self._inflate(f)
+            base_type, base = self._read_pack_object(f, offset - rel)
+            return base_type, _apply_delta(base, delta)
+        if type_id == _OBJ_REF_DELTA:
+            base_sha = f.read(20).hex()
+            delta = self._inflate(f)
+            base_type_name, base = self.read_object(base_sha)
+            base_type = {v: k for k, v in _TYPE_NAMES.items()}[base_type_name]
+            return base_type, _apply_delta(base, delta)
+        return type_id, self._inflate(f)
+
+    @staticmethod
+    def _inflate(f) -> bytes:
+        d = zlib.decompressobj()
+        out = bytearray()
+        while not d.eof:
+            chunk = f.read(4096)
+            if not chunk:
+                raise LocalGitError("pack 数据被截断")
+            out += d.decompress(chunk)
+        return bytes(out)
+
+    # ---- 提交 ----
+
+    @staticmethod
+    def _parse_person(value: str) -> tuple[str, str]:
+        """'Name <email> 1700000000 +0800' → (Name, ISO8601 UTC 时间)"""
+        name, _, rest = value.partition(" <")
+        parts = rest.rsplit(" ", 2)
+        try:
+            ts = int(parts[-2])
+        except (IndexError, ValueError):
+            return name, ""
+        return name, datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def read_commit(self, sha: str) -> Dict[str, Any]:
+        obj_type, body = self.read_object(sha)
+        if obj_type != "commit":
+            raise LocalGitError(f"对象 {sha} 不是提交")
+        header, _, message = body.decode("utf-8", "replace").partition("\n\n")
+        parents: List[str] = []
+        author = committer = ("", "")
+        for line in header.split("\n"):
+            key, _, value = line.partition(" ")
+            if key == "parent":
+                parents.append(value)
+            elif key == "author":
+                author = self._parse_person(value)
+            elif key == "committer":
+                committer = self._parse_person(value)
+        return {
+            "sha": sha,
+            "parents": parents,
+            "commit": {
+                "message": message.rstrip("\n"),
+                "author": {"name": author[0], "date": author[1]},
+                "committer": {"name": committer[0], "date": committer[1]},
+            },
+        }
+
+    def recent_commits(self, branch: str, count: int, since: str | None = None) -> List[Dict[str, Any]]:
+        """从分支头沿第一父提交遍历，返回最多 count 条（新 → 旧）"""
+        commits: List[Dict[str, Any]] = []
+        sha = self.resolve_ref(branch)
+        while sha and len(commits) < count:
+            commit = self.read_commit(sha)
+            if since and commit["commit"]["committer"]["date"] and commit["commit"]["committer"]["date"] < since:
+                break
+            commits.append(commit)
+            sha = commit["parents"][0] if commit["parents"] else None
+        return commits
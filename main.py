@@ -1,14 +1,10 @@
 import aiohttp
-import ssl
-import certifi
-import re
 import os
-import json
 import time
 import random
 import asyncio
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import Any, Awaitable, Callable, Dict, List
 
 from astrbot.api.event import filter, AstrMessageEvent
 from astrbot.api.star import Context, Star, register, StarTools
@@ -17,6 +13,22 @@ from astrbot.core.platform.sources.aiocqhttp.aiocqhttp_message_event import (
     AiocqhttpMessageEvent,
 )
 
+from .github_client import GitHubClient, GitHubAPIError
+from .ttl_cache import SingleFlightTTLCache
+from .blacklist import BlacklistIndex
+from .storage import create_state_store
+from .shared_cache import SharedCommitStore
+from .pending import PendingRecord, PendingRequestCache
+from .error_counter import DailyErrorCounter
+from .notifier import GroupNotifier
+from .local_git import LocalGitRepo
+from .metrics import Metrics
+from .event_filters import ReviewEventFilter, HashKeywordFilter
+from .sha_extract import ShaCandidateExtractor, DEFAULT_SEPARATORS
+from .backlog import BotHandle, run_by_group
+from .persistence import atomic_write_text
+from .sha_index import CommitWindow, ShaPrefixIndex, MATCH_NONE, MATCH_AMBIGUOUS
+
 
 @register(
     "astrbot_plugin_sha",
@@ -30,73 +42,170 @@ class GitHubShaPlugin(Star):
     def __init__(self, context: Context, config: AstrBotConfig):
         super().__init__(context)
         self.config = config
-        self._pending_cache: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._pending_cache = PendingRequestCache(
+            ttl_seconds=int(self.config.get("pending_ttl_hours", 48)) * 3600
+        )
+        self._pending_expiry_task: asyncio.Task | None = None
         self._data_dir = str(StarTools.get_data_dir("astrbot_plugin_sha"))
-        self._pending_path = os.path.join(self._data_dir, "pending_group_requests.json")
-        self._error_count_path = os.path.join(self._data_dir, "error_counts.json")
-        self._error_counts: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self._error_counts = DailyErrorCounter(
+            max_entries=self.config.get("error_count_max_entries", 0)
+        )
         self._reset_task: asyncio.Task | None = None
         self._last_reset_date: str = ""
+        self._metrics = Metrics()
+        self._metrics_task: asyncio.Task | None = None
+        self._store = create_state_store(
+            self.config.get("storage_backend", "json"),
+            self._data_dir,
+            on_flush=lambda ms: self._metrics.observe("persist_flush", ms),
+            on_error_counts=self._error_counts.merge,
+        )
+        self._blacklist = BlacklistIndex(self._store)
+        self._github = GitHubClient(
+            pool_size=self.config.get("http_pool_size", 10),
+            timeout=self.config.get("http_timeout", 10),
+            token=self.config.get("github_token", ""),
+            api_base=self.config.get("github_api_base", ""),
+        )
+        self._commit_cache = SingleFlightTTLCache(ttl=self.config.get("commit_cache_ttl", 60))
+        # 多个进程共享数据目录时，经由磁盘快照与租约合并对 GitHub 的请求
+        self._shared_commits: SharedCommitStore | None = None
+        if self.config.get("shared_commit_cache", True):
+            self._shared_commits = SharedCommitStore(
+                os.path.join(self._data_dir, "commit_cache"),
+                lease_seconds=self.config.get("http_timeout", 10) * 2,
+            )
+        # 群管理员集合缓存：键为群号，值为管理员与群主 ID 的 frozenset
+        self._admin_cache = SingleFlightTTLCache(ttl=self.config.get("admin_cache_ttl", 600))
+        self._notifier = GroupNotifier(
+            rate_per_minute=self.config.get("notify_rate_per_minute", 20),
+            merge_window=self.config.get("notify_merge_window", 1.0),
+        )
+        self._poll_task: asyncio.Task | None = None
+        self._commit_windows: Dict[tuple, CommitWindow] = {}
+        self._group_overrides_src: tuple = ()
+        self._group_overrides: Dict[str, Dict[str, Any]] = {}
+        self._local_repos_src: tuple = ()
+        self._local_repos: Dict[str, LocalGitRepo] = {}
+        # /sha 回复缓存：(repo, branch, commit_count) → (提交 SHA 元组, 渲染好的文本)
+        self._sha_replies: Dict[tuple, tuple[tuple, str]] = {}
+        # 各会话最近一次回复：unified_msg_origin → (monotonic 时间, 回复缓存键)
+        self._sha_reply_log: Dict[str, tuple[float, tuple]] = {}
+        self._sha_extractor: ShaCandidateExtractor | None = None
+        self._sha_extractor_src: str | None = None
+        self._backlog_task: asyncio.Task | None = None
+        self._backlog_on_first_event = False
+        self._connect_client: Any = None
+        # 正在审阅中的请求 flag，避免实时审阅与积压审阅重复处理同一请求
+        self._reviewing: set = set()
+        # 持久化状态在后台加载，加载完成前到达的请求在 _ready 上等待
+        self._ready = asyncio.Event()
+        self._load_task: asyncio.Task | None = None
 
     async def initialize(self):
+        try:
+            await self._github.start()
+        except Exception as e:
+            logger.error(f"[GitHub] 创建 HTTP 会话失败: {e}")
+
+        # 状态加载放到后台，不阻塞 AstrBot 启动
+        self._load_task = asyncio.create_task(self._load_state())
+
+    async def _load_state(self) -> None:
+        """在线程中加载待审请求与错误次数（同时压缩存储），完成后启动各后台任务。
+
+        各数据分别加载，某个文件损坏或读取失败时只有它使用空数据，不影响其余数据。
+        """
+        start = time.perf_counter()
         try:
             os.makedirs(self._data_dir, exist_ok=True)
-            if os.path.exists(self._pending_path):
-                with open(self._pending_path, "r", encoding="utf-8") as f:
-                    self._pending_cache = json.load(f)
-            
-            # 加载错误次数数据
-            if os.path.exists(self._error_count_path):
-                with open(self._error_count_path, "r", encoding="utf-8") as f:
-                    self._error_counts = json.load(f)
-            
+            await self._store.open()
+            expire_before = int(time.time()) - self._pending_cache.ttl_seconds
+            pending, pending_dropped = await self._load_part(
+                "待审缓存", self._store.load_pending_state(expire_before), self._pending_cache.load
+            )
+            errors, errors_dropped = await self._load_part(
+                "错误次数", self._store.load_error_count_state(self._error_counts.date), self._error_counts.load
+            )
+
+            # 加载黑名单索引（读取失败时 reload 自行记录日志）
+            await self._blacklist.reload()
+
+            elapsed = (time.perf_counter() - start) * 1000
+            self._metrics.observe("state_load", elapsed)
+            logger.info(
+                f"[审阅加群] 状态加载完成，用时 {elapsed:.1f}ms：待审请求 {pending} 条"
+                f"（丢弃过期 {pending_dropped} 条），错误计数 {errors} 条"
+                f"（丢弃旧日期 {errors_dropped} 条）"
+            )
+        except Exception as e:
+            logger.error(f"[审阅加群] 打开存储失败: {e}")
+        finally:
+            self._ready.set()
+
+        try:
             # 启动定时重置任务
             reset_hour = self.config.get("reset_hour", 4)
             if reset_hour >= 0:
                 self._reset_task = asyncio.create_task(self._reset_scheduler())
                 logger.info(f"[审阅加群] 已启动定时重置任务，重置时间：每日 {reset_hour}:00")
-        except Exception as e:
-            logger.error(f"[审阅加群] 加载待审缓存失败: {e}")
 
-    def _save_pending_cache(self) -> None:
-        try:
-            with open(self._pending_path, "w", encoding="utf-8") as f:
-                json.dump(self._pending_cache, f, ensure_ascii=False, indent=2)
+            # 启动待审请求过期清理任务
+            self._pending_expiry_task = asyncio.create_task(self._pending_expiry_loop())
+
+            # 启动后台提交轮询任务
+            poll_interval = self.config.get("commit_poll_interval", 0)
+            if poll_interval > 0:
+                self._poll_task = asyncio.create_task(self._commit_poller())
+                logger.info(f"[GitHub] 已启动后台提交轮询，间隔约 {poll_interval} 秒")
+
+            # 启动统计导出任务
+            if self._get_metrics_path():
+                self._metrics_task = asyncio.create_task(self._metrics_dump_loop())
+
+            # 审阅离线期间积压的待审请求，并在适配器重连时再次审阅
+            client = self._get_onebot_client()
+            if client is not None:
+                self._subscribe_connect(client)
+            if self.config.get("backlog_review_on_start", True) and len(self._pending_cache):
+                if client is not None:
+                    self._schedule_backlog_review(client, "", "启动")
+                else:
+                    self._backlog_on_first_event = True
         except Exception as e:
-            logger.error(f"[审阅加群] 保存待审缓存失败: {e}")
-    
-    def _save_error_counts(self) -> None:
-        """保存错误次数数据到文件"""
+            logger.error(f"[审阅加群] 启动后台任务失败: {e}")
+
+    @staticmethod
+    async def _load_part(name: str, load: Awaitable, build: Callable[[Any], None]) -> tuple[int, int]:
+        """加载一份数据并在线程中构建内存结构，返回 (保留条数, 丢弃条数)；失败时保持为空"""
         try:
-            with open(self._error_count_path, "w", encoding="utf-8") as f:
-                json.dump(self._error_counts, f, ensure_ascii=False, indent=2)
+            data, kept, dropped = await load
+            # 构建内存结构同样放到线程中；加载完成前不会有其他代码访问这些对象
+            await asyncio.to_thread(build, data)
+            return kept, dropped
         except Exception as e:
-            logger.error(f"[审阅加群] 保存错误次数数据失败: {e}")
-    
+            logger.error(f"[审阅加群] 加载{name}失败，使用空数据: {e}")
+            return 0, 0
+
+    async def _wait_ready(self) -> None:
+        """等待启动时的状态加载完成"""
+        if not self._ready.is_set():
+            with self._metrics.timer("state_load_wait"):
+                await self._ready.wait()
+
     def _get_today_date(self) -> str:
         """获取今天的日期字符串 (YYYY-MM-DD)"""
-        return datetime.now().strftime("%Y-%m-%d")
+        return self._error_counts.date
     
     def _get_error_count(self, group_id: str, user_id: str) -> int:
         """获取用户今日的错误次数"""
-        today = self._get_today_date()
-        return self._error_counts.get(str(group_id), {}).get(str(user_id), {}).get(today, 0)
+        return self._error_counts.get(group_id, user_id)
     
     def _increment_error_count(self, group_id: str, user_id: str) -> int:
         """增加用户今日的错误次数,返回增加后的次数"""
-        today = self._get_today_date()
-        group_id = str(group_id)
-        user_id = str(user_id)
-        
-        if group_id not in self._error_counts:
-            self._error_counts[group_id] = {}
-        if user_id not in self._error_counts[group_id]:
-            self._error_counts[group_id][user_id] = {}
-        
-        current = self._error_counts[group_id][user_id].get(today, 0)
-        self._error_counts[group_id][user_id][today] = current + 1
-        self._save_error_counts()
-        return current + 1
+        count = self._error_counts.increment(group_id, user_id)
+        self._store.add_error_count(str(group_id), str(user_id), self._error_counts.date, 1)
+        return count
     
     def _is_over_max_attempts(self, group_id: str, user_id: str) -> bool:
         """检查用户今日是否已超过最大错误次数"""
@@ -134,22 +243,9 @@ class GitHubShaPlugin(Star):
                 today = self._get_today_date()
                 if today != self._last_reset_date:
                     logger.info(f"[审阅加群] 开始重置错误次数计数器 (日期: {today})")
-                    # 清空所有旧日期的数据
-                    for group_id in list(self._error_counts.keys()):
-                        for user_id in list(self._error_counts[group_id].keys()):
-                            # 只保留今天的数据
-                            user_data = self._error_counts[group_id][user_id]
-                            self._error_counts[group_id][user_id] = {
-                                k: v for k, v in user_data.items() if k == today
-                            }
-                            # 如果用户没有今天的数据,删除该用户
-                            if not self._error_counts[group_id][user_id]:
-                                del self._error_counts[group_id][user_id]
-                        # 如果群组没有用户,删除该群组
-                        if not self._error_counts[group_id]:
-                            del self._error_counts[group_id]
-                    
-                    self._save_error_counts()
+                    # 推进计数代,旧日期的记录惰性清理
+                    self._error_counts.reset()
+                    self._store.prune_error_counts(today)
                     self._last_reset_date = today
                     logger.info("[审阅加群] 错误次数计数器重置完成")
                 
@@ -163,65 +259,113 @@ class GitHubShaPlugin(Star):
     def _remember_request(self, group_id: str, user_id: str, flag: str, sub_type: str, comment: str) -> None:
         group_id = str(group_id)
         user_id = str(user_id)
-        self._pending_cache.setdefault(group_id, {})[user_id] = {
-            "flag": flag,
-            "sub_type": sub_type,
-            "comment": comment or "",
-            "ts": int(time.time()),
-        }
+        record = PendingRecord(flag, sub_type, comment, int(time.time()))
+        self._pending_cache.put(group_id, user_id, record)
+        self._store.upsert_pending(group_id, user_id, record.to_json())
 
-        expire_before = int(time.time()) - 48 * 3600
-        for gid in list(self._pending_cache.keys()):
-            for uid in list(self._pending_cache[gid].keys()):
-                if int(self._pending_cache[gid][uid].get("ts", 0)) < expire_before:
-                    del self._pending_cache[gid][uid]
-            if not self._pending_cache[gid]:
-                del self._pending_cache[gid]
-        self._save_pending_cache()
+    def _expire_pending_requests(self) -> int:
+        """删除已过期的待审请求，返回删除数量"""
+        removed = self._pending_cache.expire()
+        for gid, uid in removed:
+            self._store.delete_pending(gid, uid)
+        return len(removed)
 
-    def _get_cached_request(self, group_id: str, user_id: str) -> Dict[str, Any] | None:
-        return self._pending_cache.get(str(group_id), {}).get(str(user_id))
-
-    def _group_join_data_path(self) -> str:
-        return os.path.join(str(StarTools.get_data_dir("astrbot_plugin_sha")), "group_join_data.json")
+    async def _pending_expiry_loop(self) -> None:
+        """定时增量清理过期的待审请求"""
+        while True:
+            try:
+                await asyncio.sleep(60)
+                removed = self._expire_pending_requests()
+                if removed:
+                    logger.debug(
+                        f"[审阅加群] 清理过期待审请求 {removed} 条，当前 {len(self._pending_cache)} 条，"
+                        f"累计清理 {self._pending_cache.evicted} 条"
+                    )
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"[审阅加群] 清理过期待审请求失败: {e}")
 
-    def _load_group_join_blacklist(self) -> Dict[str, Any]:
-        try:
-            path = self._group_join_data_path()
-            if os.path.exists(path):
-                with open(path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    return data or {}
-        except Exception as e:
-            logger.error(f"[审阅加群] 读取黑名单失败: {e}")
-        return {}
+    def _get_cached_request(self, group_id: str, user_id: str) -> PendingRecord | None:
+        return self._pending_cache.get(group_id, user_id)
 
     def _is_blacklisted(self, group_id: str, user_id: str) -> bool:
-        data = self._load_group_join_blacklist()
-        reject_ids: Dict[str, List[str]] = data.get("reject_ids", {})
-        group_list = reject_ids.get(str(group_id), []) or []
-        return str(user_id) in {str(x) for x in group_list}
+        return self._blacklist.contains(group_id, user_id)
 
-    def _get_repo_cfg(self) -> tuple[str, str, int]:
+    async def reload_blacklist(self) -> bool:
+        """强制重新加载黑名单"""
+        return await self._blacklist.reload(force=True)
+
+    def _get_group_overrides(self) -> Dict[str, Dict[str, Any]]:
+        """解析 group_repo_overrides，格式：群号=owner/repo[@分支][:窗口大小]"""
+        raw = tuple(str(x).strip() for x in (self.config.get("group_repo_overrides", []) or []))
+        if raw == self._group_overrides_src:
+            return self._group_overrides
+
+        overrides: Dict[str, Dict[str, Any]] = {}
+        for item in raw:
+            group_id, sep, spec = item.partition("=")
+            group_id, spec = group_id.strip(), spec.strip()
+            if not sep or not group_id or not spec:
+                logger.warning(f"[审阅加群] 忽略无效的群仓库配置: {item}")
+                continue
+            window = None
+            head, colon, tail = spec.rpartition(":")
+            if colon and tail.strip().isdigit():
+                spec, window = head, int(tail)
+            repo, _, branch = spec.partition("@")
+            if "/" not in repo:
+                logger.warning(f"[审阅加群] 忽略无效的群仓库配置: {item}")
+                continue
+            overrides[group_id] = {
+                "repo": repo.strip(),
+                "branch": branch.strip() or None,
+                "window": window,
+            }
+
+        self._group_overrides_src = raw
+        self._group_overrides = overrides
+        return overrides
+
+    def _get_repo_cfg(self, group_id: str | None = None) -> tuple[str, str, int]:
         github_repo = self.config.get("github_repo", "AstrBotDevs/AstrBot")
         branch = self.config.get("branch", "master")
         commit_count = self.config.get("commit_count", 5)
+        override = self._get_group_overrides().get(str(group_id)) if group_id else None
+        if override:
+            github_repo = override["repo"]
+            branch = override["branch"] or branch
         return github_repo, branch, commit_count
 
-    def _is_group_admin(self, event: AiocqhttpMessageEvent, group) -> bool:
+    @staticmethod
+    def _group_admin_ids(group) -> frozenset:
+        """群管理员与群主的 ID 集合"""
         if not group:
-            return False
-        self_id = str(event.get_self_id())
-        admin_ids = [str(x) for x in (group.group_admins or [])]
-        owner_id = str(group.group_owner) if group.group_owner else None
-        return self_id in admin_ids or (owner_id and self_id == owner_id)
+            return frozenset()
+        admin_ids = {str(x) for x in (group.group_admins or [])}
+        if group.group_owner:
+            admin_ids.add(str(group.group_owner))
+        return frozenset(admin_ids)
+
+    async def _is_self_group_admin(self, event: AiocqhttpMessageEvent, group_id: str) -> bool:
+        """经由 TTL 缓存判断机器人是否为群管理员，同一群的并发查询只调用一次 get_group"""
+
+        async def _load(_etag: str | None):
+            with self._metrics.timer("get_group"):
+                group = await event.get_group(group_id=group_id)
+            return self._group_admin_ids(group), None
+
+        admin_ids = await self._admin_cache.get(str(group_id), _load)
+        return str(event.get_self_id()) in admin_ids
 
     @staticmethod
-    def _match_sha_prefixes(candidates: List[str], recent_shas: List[str]) -> tuple[bool, str | None]:
-        for cand in candidates:
-            if len(cand) >= 7 and any(s.startswith(cand) for s in recent_shas):
-                return True, cand
-        return False, None
+    def _match_sha_prefixes(
+        candidates: List[str], recent_shas: ShaPrefixIndex | List[str]
+    ) -> tuple[str, str | None]:
+        """返回 (匹配状态, 命中的前缀)，状态为 unique / ambiguous / none"""
+        if not isinstance(recent_shas, ShaPrefixIndex):
+            recent_shas = ShaPrefixIndex(recent_shas)
+        return recent_shas.match(candidates)
 
     def _format_summary(self, approved: int, rejected: int, skipped_blacklist: int, details: List[str]) -> str:
         if approved == 0 and rejected == 0:
@@ -244,7 +388,7 @@ class GitHubShaPlugin(Star):
         flag: str | None,
         sub_type: str,
         comment: str,
-        recent_shas: List[str],
+        recent_shas: ShaPrefixIndex | List[str],
     ) -> Dict[str, Any]:
         """
         统一的单条请求审阅流程，供自动/手动复用。
@@ -291,7 +435,8 @@ class GitHubShaPlugin(Star):
             }
 
         sha_candidates = self._extract_sha_candidates(comment)
-        matched, matched_prefix = self._match_sha_prefixes(sha_candidates, recent_shas)
+        match_status, matched_prefix = self._match_sha_prefixes(sha_candidates, recent_shas)
+        matched = match_status != MATCH_NONE
 
         try:
             reject_no_sha_msgs = [
@@ -313,18 +458,20 @@ class GitHubShaPlugin(Star):
                     else random.choice(reject_mismatch_msgs)
                 )
 
-            await event.bot.set_group_add_request(
-                flag=str(flag),
-                sub_type=sub_type or "add",
-                approve=matched,
-                reason=reason_text,
-            )
+            with self._metrics.timer("set_group_add_request"):
+                await event.bot.set_group_add_request(
+                    flag=str(flag),
+                    sub_type=sub_type or "add",
+                    approve=matched,
+                    reason=reason_text,
+                )
             
             if matched:
+                ambiguous_note = "，对应多个提交" if match_status == MATCH_AMBIGUOUS else ""
                 return {
                     "outcome": "approved",
                     "matched_prefix": matched_prefix,
-                    "message": f"{user_id}: 已批准 (匹配 {matched_prefix})",
+                    "message": f"{user_id}: 已批准 (匹配 {matched_prefix}{ambiguous_note})",
                     "error_count": 0
                 }
             else:
@@ -359,18 +506,86 @@ class GitHubShaPlugin(Star):
                 "error_count": 0
             }
 
-    @filter.regex(r"(?i)\bhash\b")
+    @filter.custom_filter(HashKeywordFilter)
     async def on_hash_keyword(self, event: AstrMessageEvent):
-        """全局监听：消息包含单词 'hash' 时触发（不依赖唤醒前缀）"""
-        async for res in self.get_github_sha(event):
+        """全局监听：消息以单词 'hash' 开头时触发（不依赖唤醒前缀）"""
+        async for res in self._reply_sha(event, from_keyword=True):
             yield res
 
     @filter.command("sha")
     async def get_github_sha(self, event: AstrMessageEvent):
-        """获取GitHub仓库指定分支的最新提交SHA"""
+        """获取GitHub仓库指定分支的最新提交SHA；/sha stats 查看审阅流程统计（仅管理员）"""
+        args = (event.message_str or "").split()
+        if len(args) > 1 and args[0].lstrip("/").lower() == "sha" and args[1].lower() == "stats":
+            if not event.is_admin():
+                yield event.plain_result("❌ 仅管理员可查看统计信息")
+                return
+            yield event.plain_result(self._metrics.render_text(*self._collect_counters()))
+            return
+
+        async for res in self._reply_sha(event):
+            yield res
+
+    def _render_sha_reply(self, key: tuple, commits: List[Dict[str, Any]]) -> str:
+        """渲染提交列表；提交集合未变化时直接复用上次渲染的文本"""
+        shas = tuple(c["sha"] for c in commits)
+        cached = self._sha_replies.get(key)
+        if cached and cached[0] == shas:
+            self._metrics.inc("sha_replies", "cached")
+            return cached[1]
+
+        github_repo, branch, commit_count = key
+        result_lines = [
+            f"🔍 {github_repo} 仓库 ({branch} 分支) 最后{commit_count}次提交 SHA：\n"
+        ]
+
+        for i, commit in enumerate(commits, 1):
+            sha = commit["sha"]
+            message = commit["commit"]["message"].split("\n")[0]
+            author = commit["commit"]["author"]["name"]
+            date = commit["commit"]["author"]["date"][:10]
+
+            result_lines.append(f"{i}. {sha} - {message}")
+            result_lines.append(f"   作者: {author} | 日期: {date}\n")
+
+        result_text = "\n".join(result_lines)
+        self._sha_replies[key] = (shas, result_text)
+        self._metrics.inc("sha_replies", "rendered")
+        return result_text
+
+    def _sha_reply_recent(self, chat: str, key: tuple, now: float) -> bool:
+        """该会话是否在冷却时间内已回复过相同仓库的提交列表"""
+        cooldown = self.config.get("sha_reply_cooldown", 30)
+        if cooldown <= 0:
+            return False
+        if len(self._sha_reply_log) > 1024:
+            self._sha_reply_log = {
+                k: v for k, v in self._sha_reply_log.items() if now - v[0] < cooldown
+            }
+        last = self._sha_reply_log.get(chat)
+        return last is not None and last[1] == key and now - last[0] < cooldown
+
+    async def _reply_sha(self, event: AstrMessageEvent, from_keyword: bool = False):
+        """/sha 与 hash 关键词共用的回复流程。
+
+        冷却时间内同一会话重复触发时：关键词触发直接忽略，/sha 命令复用上次的回复且不请求 GitHub。
+        """
+        start = time.perf_counter()
         try:
-            github_repo, branch, commit_count = self._get_repo_cfg()
-            github_api_url = f"https://api.github.com/repos/{github_repo}/commits"
+            group_id = event.get_group_id() or None
+            github_repo, branch, commit_count = self._get_repo_cfg(group_id)
+            key = (github_repo, branch, commit_count)
+            chat = event.unified_msg_origin
+            now = time.monotonic()
+
+            if self._sha_reply_recent(chat, key, now):
+                cached = self._sha_replies.get(key)
+                if from_keyword or cached is None:
+                    self._metrics.inc("sha_replies", "suppressed")
+                    return
+                self._metrics.inc("sha_replies", "cached")
+                yield event.plain_result(cached[1])
+                return
 
             if github_repo == "AstrBotDevs/AstrBot":
                 reminder_msg = (
@@ -382,46 +597,22 @@ class GitHubShaPlugin(Star):
 
             logger.debug(f"开始获取 {github_repo} 仓库的提交SHA...")
 
-            ssl_ctx = ssl.create_default_context(cafile=certifi.where())
-
-            connector = aiohttp.TCPConnector(ssl=ssl_ctx)
-            async with aiohttp.ClientSession(connector=connector) as session:
-                params = {"sha": branch, "per_page": commit_count}
-
-                async with session.get(github_api_url, params=params) as response:
-                    if response.status == 200:
-                        commits = await response.json()
-
-                        if not commits:
-                            yield event.plain_result("❌ 未找到任何提交记录")
-                            return
-
-                        result_lines = [
-                            f"🔍 {github_repo} 仓库 ({branch} 分支) 最后{commit_count}次提交 SHA：\n"
-                        ]
+            commits = (await self._get_recent_commits(group_id, priority=True))[:commit_count]
 
-                        for i, commit in enumerate(commits, 1):
-                            sha = commit["sha"]
-                            message = commit["commit"]["message"].split("\n")[
-                                0
-                            ]
-                            author = commit["commit"]["author"]["name"]
-                            date = commit["commit"]["author"]["date"][
-                                :10
-                            ]
-
-                            result_lines.append(f"{i}. {sha} - {message}")
-                            result_lines.append(f"   作者: {author} | 日期: {date}\n")
+            if not commits:
+                yield event.plain_result("❌ 未找到任何提交记录")
+                return
 
-                        result_text = "\n".join(result_lines)
-                        yield event.plain_result(result_text)
+            result_text = self._render_sha_reply(key, commits)
+            self._sha_reply_log[chat] = (now, key)
+            yield event.plain_result(result_text)
 
-                        logger.debug(f"成功获取 {github_repo} 的GitHub提交SHA")
+            logger.debug(f"成功获取 {github_repo} 的GitHub提交SHA")
 
-                    else:
-                        error_msg = f"GitHub API 请求失败，状态码: {response.status}"
-                        logger.error(error_msg)
-                        yield event.plain_result(f"❌ {error_msg}")
+        except GitHubAPIError as e:
+            error_msg = str(e)
+            logger.error(error_msg)
+            yield event.plain_result(f"❌ {error_msg}")
 
         except aiohttp.ClientError as e:
             error_msg = f"网络请求错误: {str(e)}"
@@ -433,49 +624,506 @@ class GitHubShaPlugin(Star):
             logger.error(error_msg)
             yield event.plain_result(f"❌ {error_msg}")
 
-    async def _fetch_recent_commit_shas(self) -> List[str]:
-        """返回最近配置数量的提交 SHA 列表（完整 40 位）。"""
-        github_repo = self.config.get("github_repo", "AstrBotDevs/AstrBot")
-        branch = self.config.get("branch", "master")
-        commit_count = self.config.get("commit_count", 5)
-        github_api_url = f"https://api.github.com/repos/{github_repo}/commits"
-
-        ssl_ctx = ssl.create_default_context(cafile=certifi.where())
-        connector = aiohttp.TCPConnector(ssl=ssl_ctx)
-        async with aiohttp.ClientSession(connector=connector) as session:
-            params = {"sha": branch, "per_page": commit_count}
-            async with session.get(github_api_url, params=params) as response:
-                if response.status != 200:
-                    raise RuntimeError(
-                        f"GitHub API 请求失败，状态码: {response.status}"
+        finally:
+            self._metrics.observe("sha_command", (time.perf_counter() - start) * 1000)
+
+    def _collect_counters(self) -> tuple[Dict[str, Dict[str, int]], Dict[str, Dict[str, int]]]:
+        """汇总各组件自带的统计，返回 (累计计数, 当前值)，与审阅流程的计数一起输出"""
+        commit_cache = self._commit_cache.stats()
+        admin_cache = self._admin_cache.stats()
+        gauges: Dict[str, Dict[str, int]] = {
+            "commit_cache_entries": {"": commit_cache.pop("entries")},
+            "admin_cache_entries": {"": admin_cache.pop("entries")},
+            "pending_requests": {"": len(self._pending_cache)},
+        }
+        counters: Dict[str, Dict[str, int]] = {
+            "commit_cache": commit_cache,
+            "admin_cache": admin_cache,
+            "github_responses": {str(k): v for k, v in self._github.status_counts.items()},
+            "notifier": {"sent": self._notifier.sent, "merged": self._notifier.merged},
+            "pending_evicted": {"": self._pending_cache.evicted},
+        }
+        if self._shared_commits is not None:
+            counters["shared_commits"] = self._shared_commits.stats()
+        flushes = getattr(self._store, "writers", None) or [self._store]
+        counters["persist_flushes"] = {"count": sum(getattr(w, "flush_count", 0) for w in flushes)}
+        return counters, gauges
+
+    def _get_metrics_path(self) -> str:
+        """metrics_file 配置的 Prometheus 文本导出路径，相对路径基于插件数据目录"""
+        path = str(self.config.get("metrics_file", "") or "").strip()
+        if path and not os.path.isabs(path):
+            path = os.path.join(self._data_dir, path)
+        return path
+
+    async def _dump_metrics(self) -> None:
+        path = self._get_metrics_path()
+        text = self._metrics.render_prometheus(*self._collect_counters())
+        try:
+            await asyncio.to_thread(atomic_write_text, path, text)
+        except Exception as e:
+            logger.error(f"[审阅加群] 写入统计文件失败 {path}: {e}")
+
+    async def _metrics_dump_loop(self) -> None:
+        """定时把统计信息以 Prometheus 文本格式写入 metrics_file"""
+        while True:
+            try:
+                await asyncio.sleep(max(5, self.config.get("metrics_dump_interval", 60)))
+                await self._dump_metrics()
+            except asyncio.CancelledError:
+                break
+
+    def _get_window_cfg(self, group_id: str | None = None) -> tuple[str, str, int, int]:
+        """返回审阅使用的提交窗口配置 (repo, branch, 窗口大小, 天数)"""
+        github_repo, branch, commit_count = self._get_repo_cfg(group_id)
+        window_size = max(commit_count, self.config.get("commit_window_size", 0))
+        override = self._get_group_overrides().get(str(group_id)) if group_id else None
+        if override and override["window"]:
+            window_size = max(commit_count, override["window"])
+        window_days = self.config.get("commit_window_days", 0)
+        return github_repo, branch, window_size, window_days
+
+    def _all_window_cfgs(self) -> List[tuple]:
+        """全局配置与所有群单独配置对应的提交窗口（去重）"""
+        keys = [self._get_window_cfg()]
+        for group_id in self._get_group_overrides():
+            key = self._get_window_cfg(group_id)
+            if key not in keys:
+                keys.append(key)
+        return keys
+
+    def _get_commit_window(self, key: tuple) -> CommitWindow:
+        window = self._commit_windows.get(key)
+        if window is None:
+            window = self._commit_windows[key] = CommitWindow(key[2], key[3])
+        return window
+
+    def _get_local_repo(self, github_repo: str) -> LocalGitRepo | None:
+        """local_git_repos 中为该仓库配置的本地镜像，格式：owner/repo=/path/to/repo.git"""
+        raw = tuple(str(x).strip() for x in (self.config.get("local_git_repos", []) or []))
+        if raw != self._local_repos_src:
+            repos: Dict[str, LocalGitRepo] = {}
+            for item in raw:
+                name, sep, path = item.partition("=")
+                if not sep or not name.strip() or not path.strip():
+                    logger.warning(f"[GitHub] 忽略无效的本地仓库配置: {item}")
+                    continue
+                try:
+                    repos[name.strip().lower()] = LocalGitRepo(path.strip())
+                except Exception as e:
+                    logger.error(f"[GitHub] 打开本地仓库失败 {item}: {e}")
+            self._local_repos_src = raw
+            self._local_repos = repos
+        return self._local_repos.get(github_repo.lower())
+
+    async def _load_local_window(self, key: tuple, repo: LocalGitRepo, etag: str | None):
+        """从本地镜像读取提交；引用文件未变化时视为未修改（相当于 304）"""
+        github_repo, branch, window_size, window_days = key
+        window = self._get_commit_window(key)
+        known = etag if len(window) else None
+
+        def _read():
+            stamp = repr(repo.ref_stamp(branch))
+            if stamp == known:
+                return None, stamp
+            return repo.recent_commits(branch, window_size, since=window.since()), stamp
+
+        with self._metrics.timer("local_git_read"):
+            commits, stamp = await asyncio.to_thread(_read)
+        if commits is None:
+            return None, stamp
+        added = window.merge(commits)
+        logger.debug(f"[GitHub] 已从本地仓库刷新 {github_repo}@{branch}: 新增 {added}，共 {len(window)}")
+        return window.snapshot(), stamp
+
+    async def _load_commit_window(self, key: tuple, etag: str | None, priority: bool = False):
+        """刷新提交窗口：本地镜像直接读取，其余经共享快照（如启用）或直接请求 GitHub"""
+        local_repo = self._get_local_repo(key[0])
+        if local_repo is not None:
+            return await self._load_local_window(key, local_repo, etag)
+        if self._shared_commits is None:
+            return await self._fetch_commit_window(key, etag, priority)
+
+        window = self._get_commit_window(key)
+
+        async def _fetch():
+            commits, new_etag = await self._fetch_commit_window(key, etag, priority)
+            if commits is None:
+                # 304：本进程窗口仍是最新的，同样写回快照以刷新获取时间
+                return window.snapshot(), etag
+            return commits, new_etag
+
+        snapshot = await self._shared_commits.get(key, self._shared_max_age(), _fetch)
+        window.merge(snapshot["commits"], snapshot.get("fetched_at", 0))
+        return window.snapshot(), snapshot.get("etag")
+
+    def _shared_max_age(self) -> float:
+        """共享快照的有效期：启用轮询时为轮询间隔的一半，否则与提交缓存 TTL 相同"""
+        poll_interval = self.config.get("commit_poll_interval", 0)
+        return max(10, poll_interval) / 2 if poll_interval > 0 else self.config.get("commit_cache_ttl", 60)
+
+    async def _fetch_commit_window(self, key: tuple, etag: str | None, priority: bool = False):
+        """增量刷新提交窗口：只翻页到与已有提交衔接的位置为止"""
+        github_repo, branch, window_size, window_days = key
+        window = self._get_commit_window(key)
+        if not len(window):
+            etag = None
+
+        since = window.since()
+        per_page = min(window_size, GitHubClient.MAX_PER_PAGE)
+        with self._metrics.timer("github_fetch"):
+            first, new_etag = await self._github.fetch_commits_conditional(
+                github_repo, branch, per_page, etag=etag, since=since, priority=priority
+            )
+        if first is None:
+            return None, etag
+
+        fresh = list(first)
+        page = 1
+        while (
+            len(first) == per_page
+            and len(fresh) < window_size
+            and not window.contains(first[-1].get("sha", ""))
+        ):
+            page += 1
+            first, _ = await self._github.fetch_commits_conditional(
+                github_repo, branch, per_page, page=page, since=since, priority=priority
+            )
+            if not first:
+                break
+            fresh.extend(first)
+
+        added = window.merge(fresh)
+        logger.debug(
+            f"[GitHub] 提交窗口已刷新 {github_repo}@{branch}: 新增 {added}，共 {len(window)}，请求 {page} 页"
+        )
+        return window.snapshot(), new_etag
+
+    async def _get_commits_for_key(
+        self, key: tuple, force: bool = False, priority: bool = False
+    ) -> List[Dict[str, Any]]:
+        """经由 TTL 缓存获取提交窗口（原始 JSON，新 → 旧），并发请求会被合并。
+
+        启用后台轮询时允许直接返回旧值，由轮询任务负责刷新。priority 为 /sha 等即时请求，
+        可以使用 GitHubClient 预留的配额。
+        """
+
+        async def _load(etag: str | None):
+            return await self._load_commit_window(key, etag, priority)
+
+        max_age = self.config.get("github_stale_max_minutes", 120) * 60
+        try:
+            commits = await self._commit_cache.get(
+                key,
+                _load,
+                force=force,
+                stale_ok=self._poll_task is not None,
+                stale_max_age=max_age,
+            )
+        except Exception as e:
+            # GitHub 限流或不可用时，在允许的时效内继续使用最后一次成功获取的结果
+            stale, age = self._commit_cache.peek_with_age(key)
+            if stale is None or age > max_age:
+                raise
+            logger.warning(f"[GitHub] 获取提交失败，使用 {int(age)} 秒前的结果: {e}")
+            commits = stale
+        return commits or []
+
+    async def _get_recent_commits(
+        self, group_id: str | None = None, force: bool = False, priority: bool = False
+    ) -> List[Dict[str, Any]]:
+        return await self._get_commits_for_key(self._get_window_cfg(group_id), force=force, priority=priority)
+
+    async def _get_recent_sha_index(self, group_id: str | None = None) -> ShaPrefixIndex:
+        """返回该群对应提交窗口的前缀索引，供审阅流程匹配 SHA"""
+        key = self._get_window_cfg(group_id)
+        await self._get_commits_for_key(key)
+        window = self._commit_windows.get(key)
+        return window.index if window else ShaPrefixIndex()
+
+    async def _refresh_all_windows(self) -> None:
+        """刷新所有仓库的提交窗口。
+
+        本地镜像仓库逐个读取；其余仓库在配置了 Token 且不止一个时，使用一次 GraphQL
+        查询批量获取，批量结果无法与已有窗口衔接时（新提交超过 100 条），该仓库回退到 REST 翻页。
+        """
+        keys = [key for key in self._all_window_cfgs() if self._get_local_repo(key[0]) is None]
+        single = [key for key in self._all_window_cfgs() if key not in keys]
+        if len(keys) <= 1 or not self._github.has_token:
+            single += keys
+            keys = []
+        if single:
+            results = await asyncio.gather(
+                *(self._get_commits_for_key(key, force=True) for key in single),
+                return_exceptions=True,
+            )
+            for key, result in zip(single, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"[GitHub] 刷新 {key[0]}@{key[1]} 失败，继续使用上次结果: {result}")
+        if not keys:
+            return
+
+        if self._shared_commits is None:
+            await self._refresh_windows_batch(keys)
+            return
+        # 多个进程共用一个批量租约，只有一个进程发出 GraphQL 查询，其余读取其写回的快照
+        snapshots = await self._shared_commits.get_many(
+            keys, self._shared_max_age(), lambda: self._refresh_windows_batch(keys)
+        )
+        for key, snapshot in snapshots.items():
+            window = self._get_commit_window(key)
+            window.merge(snapshot["commits"], snapshot.get("fetched_at", 0))
+            self._commit_cache.put(key, window.snapshot())
+
+    async def _refresh_windows_batch(self, keys: List[tuple]) -> None:
+        """使用一次 GraphQL 查询刷新多个仓库的提交窗口，并写回共享快照（如启用）"""
+        windows = [self._get_commit_window(key) for key in keys]
+        with self._metrics.timer("github_batch"):
+            batch = await self._github.fetch_commits_batch(
+                [(key[0], key[1], key[2], window.since()) for key, window in zip(keys, windows)]
+            )
+        for key, window, commits in zip(keys, windows, batch):
+            if commits is None:
+                logger.warning(f"[GitHub] 批量查询未找到 {key[0]}@{key[1]}")
+                continue
+            first = min(key[2], GitHubClient.MAX_PER_PAGE)
+            etag = None
+            if (
+                len(commits) == first < key[2]
+                and commits
+                and not window.contains(commits[-1]["sha"])
+            ):
+                # 直接翻页而不经共享快照：本进程已持有批量租约，快照可能正是本轮之前写回的旧值
+                try:
+                    _, etag = await self._fetch_commit_window(key, None)
+                except Exception as e:
+                    logger.warning(f"[GitHub] 刷新 {key[0]}@{key[1]} 失败，继续使用上次结果: {e}")
+                    continue
+            else:
+                window.merge(commits)
+            self._commit_cache.put(key, window.snapshot(), etag)
+            if self._shared_commits is not None:
+                await self._shared_commits.publish(key, window.snapshot(), etag)
+        logger.debug(f"[GitHub] 批量刷新 {len(keys)} 个提交窗口完成")
+
+    async def _commit_poller(self) -> None:
+        """后台定时刷新提交列表，使审阅流程始终可以直接使用内存中的 SHA 集合"""
+        while True:
+            try:
+                try:
+                    await self._refresh_all_windows()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # 刷新失败时缓存中仍保留上一次成功获取的提交列表
+                    logger.warning(f"[GitHub] 后台刷新提交列表失败，继续使用上次结果: {e}")
+
+                interval = max(10, self.config.get("commit_poll_interval", 0))
+                # 按剩余配额放慢刷新，熔断期间等到熔断结束
+                remote = [k for k in self._all_window_cfgs() if self._get_local_repo(k[0]) is None]
+                # 与 _refresh_all_windows 一致：有 Token 且不止一个仓库时每轮只有一次 GraphQL 查询
+                if self._github.has_token and len(remote) > 1:
+                    calls, resource = 1, "graphql"
+                else:
+                    calls, resource = len(remote), "core"
+                interval = max(
+                    interval,
+                    self._github.suggested_interval(calls, resource),
+                    self._github.breaker.open_until - time.time(),
+                )
+                await asyncio.sleep(interval * random.uniform(0.9, 1.1))
+            except asyncio.CancelledError:
+                logger.info("[GitHub] 后台提交轮询任务已取消")
+                break
+
+    def _extract_sha_candidates(self, text: str) -> List[str]:
+        """从文本中提取可能的 SHA 前缀（至少7位），支持全角字符与分隔符拆开的 SHA。"""
+        separators = str(self.config.get("sha_separators", DEFAULT_SEPARATORS))
+        if self._sha_extractor is None or self._sha_extractor_src != separators:
+            self._sha_extractor = ShaCandidateExtractor(separators)
+            self._sha_extractor_src = separators
+        return self._sha_extractor.extract(text)
+
+    def _is_group_enabled(self, group_id: str) -> bool:
+        """白名单模式开启时，只审阅 enabled_groups 中的群"""
+        if not self.config.get("use_group_whitelist", False):
+            return True
+        enabled_groups = self.config.get("enabled_groups", [])
+        return bool(enabled_groups) and str(group_id) in [str(g) for g in enabled_groups]
+
+    def _notify_outcome(self, bot: Any, self_id: str, gid: str, uid: str, comment: str, outcome: Dict[str, Any]) -> None:
+        """按审阅结果向群内提交通知（后台限速发送）"""
+        avatar_url = f"https://q1.qlogo.cn/g?b=qq&nk={uid}&s=100"
+        
+        if outcome["outcome"] == "over_limit":
+            # 已经超过错误次数上限,静默拒绝,不发送任何消息
+            logger.info(f"[审阅加群] 用户 {uid} 已超过错误上限,静默拒绝")
+        elif outcome["outcome"] == "rejected_final":
+            # 最后一次错误(刚好达到上限),发送特殊提示消息
+            error_count = outcome.get("error_count", 0)
+            notice = f"[CQ:image,file={avatar_url}]\n用户 {uid} 已经连续{error_count}次回答错误啦，这个笨蛋今天进不了这个群啦"
+            self._notifier.submit(bot, self_id, gid, "rejected_final", uid, notice)
+            logger.info(f"[审阅加群] 用户 {uid} 达到错误上限 ({error_count}次)")
+        elif outcome["outcome"] == "approved":
+            # 通过申请
+            matched = outcome.get("matched_prefix") or ""
+            notice = (
+                f"审阅结果：已通过用户 {uid} 的加群申请"
+                + (f"（匹配提交 {matched[:7]}）" if matched else "")
+                + "，欢迎加入！"
+            )
+            message_with_avatar = f"[CQ:image,file={avatar_url}]\n{notice}"
+            self._notifier.submit(bot, self_id, gid, "approved", uid, message_with_avatar)
+        elif outcome["outcome"] == "rejected":
+            # 拒绝申请,显示当前错误次数和剩余机会
+            error_count = outcome.get("error_count", 0)
+            max_attempts = self.config.get("max_attempts", 3)
+            attempts_info = ""
+            if max_attempts > 0:
+                remaining = max_attempts - error_count
+                if remaining > 0:
+                    attempts_info = f"\n剩余尝试机会：{remaining}次"
+            
+            notice = (
+                f"审阅结果：已拒绝用户 {uid} 的加群申请\n"
+                f"{(comment or '').strip() or '无'}"
+                f"{attempts_info}"
+            )
+            message_with_avatar = f"[CQ:image,file={avatar_url}]\n{notice}"
+            self._notifier.submit(bot, self_id, gid, "rejected", uid, message_with_avatar)
+
+    def _get_onebot_client(self) -> Any:
+        """aiocqhttp 适配器的 CQHttp 客户端，未加载该适配器时返回 None"""
+        try:
+            platform = self.context.get_platform(filter.PlatformAdapterType.AIOCQHTTP)
+        except Exception:
+            return None
+        return platform.get_client() if platform else None
+
+    def _subscribe_connect(self, client: Any) -> None:
+        """订阅 OneBot lifecycle.connect 元事件，适配器重连后审阅积压请求"""
+        try:
+            client.subscribe("meta_event.lifecycle.connect", self._on_adapter_connect)
+            self._connect_client = client
+        except Exception as e:
+            logger.debug(f"[审阅加群] 无法订阅适配器连接事件: {e}")
+            self._connect_client = False
+
+    async def _on_adapter_connect(self, event) -> None:
+        if self.config.get("backlog_review_on_start", True) and len(self._pending_cache):
+            self._schedule_backlog_review(self._connect_client, str(event.get("self_id") or ""), "重连")
+
+    def _schedule_backlog_review(self, bot: Any, self_id: str, reason: str) -> None:
+        if self._backlog_task and not self._backlog_task.done():
+            return
+        self._backlog_task = asyncio.create_task(self._review_backlog(bot, self_id, reason))
+
+    async def _review_backlog(self, bot: Any, self_id: str, reason: str) -> Dict[str, int]:
+        """审阅缓存中积压的待审请求。
+
+        先按仓库统一获取一次提交，再经 _review_request_core 并发审阅：不同群并行，
+        同一群内按申请时间依次处理，同时进行的审阅数不超过 backlog_concurrency。
+        """
+        if not bool(self.config.get("auto_review_on_request", True)):
+            return {}
+        try:
+            if not self_id:
+                info = await bot.call_action("get_login_info")
+                self_id = str(info.get("user_id"))
+        except Exception as e:
+            logger.info(f"[审阅加群] 适配器尚未连接，积压请求将在连接后审阅: {e}")
+            return {}
+
+        self._expire_pending_requests()
+        groups: Dict[str, List[tuple]] = {}
+        for gid, uid, record in sorted(self._pending_cache.items(), key=lambda x: x[2].ts):
+            if self._is_group_enabled(gid) and record.flag:
+                groups.setdefault(gid, []).append((uid, record))
+        if not groups:
+            return {}
+
+        total = sum(len(items) for items in groups.values())
+        logger.info(f"[审阅加群] 开始审阅积压请求（{reason}）: {total} 条，{len(groups)} 个群")
+        handle = BotHandle(bot, self_id)
+        keys = {self._get_window_cfg(gid) for gid in groups}
+        results = await asyncio.gather(*(self._get_commits_for_key(key) for key in keys), return_exceptions=True)
+        failed_keys = set()
+        for key, result in zip(keys, results):
+            if isinstance(result, Exception):
+                failed_keys.add(key)
+                logger.warning(f"[审阅加群] 获取 {key[0]}@{key[1]} 提交失败，相关积压请求本次跳过: {result}")
+        await self._blacklist.refresh_if_changed()
+        admin_ok: Dict[str, bool] = {}
+
+        async def _review_one(gid: str, item: tuple) -> str:
+            uid, record = item
+            flag = record.flag
+            if self._get_window_cfg(gid) in failed_keys:
+                return "commits_unavailable"
+            if gid not in admin_ok:
+                try:
+                    admin_ok[gid] = await self._is_self_group_admin(handle, gid)
+                except Exception as e:
+                    logger.warning(f"[审阅加群] 获取群信息失败 group_id={gid}，跳过该群积压请求: {e}")
+                    admin_ok[gid] = False
+            if not admin_ok[gid]:
+                return "not_admin"
+            if self._is_blacklisted(gid, uid):
+                return "skipped_blacklist"
+            recent_shas = await self._get_recent_sha_index(gid)
+            # 等待期间已被实时审阅处理或被新的申请覆盖；检查与登记之间不能再有 await
+            if self._pending_cache.get(gid, uid) is not record or flag in self._reviewing:
+                return "superseded"
+            self._reviewing.add(flag)
+            try:
+                with self._metrics.timer("backlog_review"):
+                    outcome = await self._review_request_core(
+                        event=handle,
+                        group_id=gid,
+                        user_id=uid,
+                        flag=flag,
+                        sub_type=record.sub_type,
+                        comment=record.comment,
+                        recent_shas=recent_shas,
                     )
-                commits = await response.json()
-                return [c["sha"] for c in commits if "sha" in c]
+            finally:
+                self._reviewing.discard(flag)
+            if self._pending_cache.get(gid, uid) is record:
+                self._pending_cache.pop(gid, uid)
+                self._store.delete_pending(gid, uid)
+            self._notify_outcome(bot, self_id, gid, uid, record.comment, outcome)
+            self._metrics.inc("backlog_outcomes", outcome["outcome"])
+            return outcome["outcome"]
 
-    @staticmethod
-    def _extract_sha_candidates(text: str) -> List[str]:
-        """从文本中提取可能的 SHA 前缀（至少7位）。"""
-        if not text:
-            return []
-        candidates = re.findall(r"\b[a-fA-F0-9]{7,40}\b", text)
-
-        dedup = []
-        for c in candidates:
-            c = c.lower()
-            if c not in dedup:
-                dedup.append(c)
-        return dedup
+        return await run_by_group(
+            groups, _review_one, concurrency=self.config.get("backlog_concurrency", 4)
+        )
 
     # 已移除手动"审阅加群"命令，所有加群请求通过自动审阅处理
 
     @filter.platform_adapter_type(filter.PlatformAdapterType.AIOCQHTTP)
+    # event_message_type 必须最先应用（写在最下面），否则处理器元数据已由其他装饰器创建，priority 会被忽略
+    @filter.custom_filter(ReviewEventFilter)
     @filter.event_message_type(filter.EventMessageType.ALL, priority=1)
     async def capture_group_add_requests(self, event: AiocqhttpMessageEvent):
-        """监听 OneBot 请求事件，缓存 flag 以便离线审批。"""
+        """监听 OneBot 请求事件，缓存 flag 以便离线审批。
+
+        ReviewEventFilter 在分发阶段同步排除普通消息，只有加群请求与管理员变动通知会进入这里。
+        """
         try:
             raw = getattr(event.message_obj, "raw_message", None)
             if not isinstance(raw, dict):
                 return
+            if self._connect_client is None:
+                self._subscribe_connect(event.bot)
+            if self._backlog_on_first_event:
+                self._backlog_on_first_event = False
+                self._schedule_backlog_review(event.bot, event.get_self_id(), "启动")
+            if raw.get("post_type") == "notice" and raw.get("notice_type") == "group_admin":
+                # 管理员变动，使该群的管理员缓存失效
+                self._admin_cache.invalidate(str(raw.get("group_id")))
+                logger.debug(f"[审阅加群] 群管理员变动，清除缓存 group_id={raw.get('group_id')}")
+                return
             if raw.get("post_type") != "request" or raw.get("request_type") != "group":
                 return
             sub_type = raw.get("sub_type") or "add"
@@ -486,98 +1134,75 @@ class GitHubShaPlugin(Star):
             flag = raw.get("flag")
             comment = raw.get("comment") or ""
             if group_id and user_id and flag:
+                self._metrics.inc("requests_received")
+                await self._wait_ready()
                 self._remember_request(str(group_id), str(user_id), str(flag), str(sub_type), str(comment))
                 logger.debug(
                     f"[审阅加群] 缓存请求: group_id={group_id}, user_id={user_id}, sub_type={sub_type}, flag_len={len(str(flag))}"
                 )
 
                 if bool(self.config.get("auto_review_on_request", True)):
+                    review_start = time.perf_counter()
                     try:
                         # 检查群聊白名单(仅当白名单模式开启时)
-                        use_whitelist = self.config.get("use_group_whitelist", False)
-                        if use_whitelist:
-                            enabled_groups = self.config.get("enabled_groups", [])
-                            if not enabled_groups or str(group_id) not in [str(g) for g in enabled_groups]:
-                                logger.debug(
-                                    f"[审阅加群] auto-skip (whitelist enabled, group not in list) group_id={group_id}"
-                                )
-                                return
+                        if not self._is_group_enabled(str(group_id)):
+                            logger.debug(
+                                f"[审阅加群] auto-skip (whitelist enabled, group not in list) group_id={group_id}"
+                            )
+                            return
 
-                        group = await event.get_group(group_id=str(group_id))
-                        if not self._is_group_admin(event, group):
+                        with self._metrics.timer("admin_check"):
+                            is_admin = await self._is_self_group_admin(event, str(group_id))
+                        if not is_admin:
                             logger.debug(
                                 f"[审阅加群] auto-skip (not admin) group_id={group_id}, user_id={user_id}"
                             )
                             return
 
-                        if self._is_blacklisted(str(group_id), str(user_id)):
+                        with self._metrics.timer("blacklist"):
+                            await self._blacklist.refresh_if_changed()
+                            blacklisted = self._is_blacklisted(str(group_id), str(user_id))
+                        if blacklisted:
+                            self._metrics.inc("review_outcomes", "skipped_blacklist")
                             logger.debug(
                                 f"[审阅加群] auto-skip (blacklist) group_id={group_id}, user_id={user_id}"
                             )
                             return
 
-                        recent_shas = [s.lower() for s in await self._fetch_recent_commit_shas()]
-                        outcome = await self._review_request_core(
-                            event=event,
-                            group_id=str(group_id),
-                            user_id=str(user_id),
-                            flag=str(flag),
-                            sub_type=sub_type,
-                            comment=str(comment),
-                            recent_shas=recent_shas,
-                        )
+                        with self._metrics.timer("commits"):
+                            recent_shas = await self._get_recent_sha_index(str(group_id))
+                        if str(flag) in self._reviewing:
+                            return
+                        self._reviewing.add(str(flag))
+                        try:
+                            with self._metrics.timer("review"):
+                                outcome = await self._review_request_core(
+                                    event=event,
+                                    group_id=str(group_id),
+                                    user_id=str(user_id),
+                                    flag=str(flag),
+                                    sub_type=sub_type,
+                                    comment=str(comment),
+                                    recent_shas=recent_shas,
+                                )
+                        finally:
+                            self._reviewing.discard(str(flag))
+                        self._metrics.inc("review_outcomes", outcome["outcome"])
 
                         gid = str(group_id)
                         uid = str(user_id)
-                        if gid in self._pending_cache and uid in self._pending_cache[gid]:
-                            del self._pending_cache[gid][uid]
-                            self._save_pending_cache()
+                        if self._pending_cache.pop(gid, uid) is not None:
+                            self._store.delete_pending(gid, uid)
 
                         try:
-                            avatar_url = f"https://q1.qlogo.cn/g?b=qq&nk={user_id}&s=100"
-                            
-                            if outcome["outcome"] == "over_limit":
-                                # 已经超过错误次数上限,静默拒绝,不发送任何消息
-                                logger.info(f"[审阅加群] 用户 {user_id} 已超过错误上限,静默拒绝")
-                            elif outcome["outcome"] == "rejected_final":
-                                # 最后一次错误(刚好达到上限),发送特殊提示消息
-                                error_count = outcome.get("error_count", 0)
-                                notice = f"[CQ:image,file={avatar_url}]\n用户 {user_id} 已经连续{error_count}次回答错误啦，这个笨蛋今天进不了这个群啦"
-                                await event.bot.send_group_msg(group_id=gid, message=notice)
-                                logger.info(f"[审阅加群] 用户 {user_id} 达到错误上限 ({error_count}次)")
-                            elif outcome["outcome"] == "approved":
-                                # 通过申请
-                                matched = outcome.get("matched_prefix") or ""
-                                notice = (
-                                    f"审阅结果：已通过用户 {user_id} 的加群申请"
-                                    + (f"（匹配提交 {matched[:7]}）" if matched else "")
-                                    + "，欢迎加入！"
-                                )
-                                message_with_avatar = f"[CQ:image,file={avatar_url}]\n{notice}"
-                                await event.bot.send_group_msg(group_id=gid, message=message_with_avatar)
-                            elif outcome["outcome"] == "rejected":
-                                # 拒绝申请,显示当前错误次数和剩余机会
-                                error_count = outcome.get("error_count", 0)
-                                max_attempts = self.config.get("max_attempts", 3)
-                                attempts_info = ""
-                                if max_attempts > 0:
-                                    remaining = max_attempts - error_count
-                                    if remaining > 0:
-                                        attempts_info = f"\n剩余尝试机会：{remaining}次"
-                                
-                                notice = (
-                                    f"审阅结果：已拒绝用户 {user_id} 的加群申请\n"
-                                    f"{(comment or '').strip() or '无'}"
-                                    f"{attempts_info}"
-                                )
-                                message_with_avatar = f"[CQ:image,file={avatar_url}]\n{notice}"
-                                await event.bot.send_group_msg(group_id=gid, message=message_with_avatar)
-
+                            self._notify_outcome(event.bot, event.get_self_id(), gid, uid, str(comment), outcome)
                         except Exception as e:
                             logger.error(f"[审阅加群] 发送群内通知失败 group_id={group_id}, user_id={user_id}: {e}")
 
+                        self._metrics.observe("auto_review_total", (time.perf_counter() - review_start) * 1000)
                         logger.debug(f"[审阅加群] auto-processed outcome={outcome['outcome']} group_id={group_id}, user_id={user_id}")
                     except Exception as e:
+                        self._metrics.inc("review_outcomes", "exception")
                         logger.error(f"[审阅加群] auto-review 异常: {e}")
         except Exception as e:
             logger.error(f"[审阅加群] capture_group_add_requests 异常: {e}")
@@ -591,4 +1216,24 @@ class GitHubShaPlugin(Star):
             except asyncio.CancelledError:
                 pass
             logger.info("[审阅加群] 已取消定时重置任务")
+        if self._connect_client:
+            try:
+                self._connect_client.unsubscribe("meta_event.lifecycle.connect", self._on_adapter_connect)
+            except Exception:
+                pass
+        for task in (self._load_task, self._poll_task, self._pending_expiry_task, self._metrics_task, self._backlog_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        await self._notifier.close()
+        await self._store.close()
+        # 先取消缓存的后台刷新，避免它们在会话关闭后继续发出请求
+        await self._commit_cache.close()
+        await self._admin_cache.close()
+        await self._github.close()
+        if self._get_metrics_path():
+            await self._dump_metrics()
         logger.info("GitHub SHA 插件已卸载")
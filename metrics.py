@@ -0,0 +1,119 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List
+
+# 耗时直方图的桶上界（毫秒），覆盖本地操作到 GitHub 超时的范围
+DEFAULT_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """固定桶的耗时直方图：observe 只做一次二分查找与计数，不保存原始样本"""
+
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds=DEFAULT_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.counts[bisect_left(self.bounds, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+    def quantile(self, q: float) -> float:
+        """按桶估算分位数（返回所在桶的上界，不超过观测到的最大值）"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+
+class Metrics:
+    """审阅流程的阶段耗时直方图与计数器"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, Dict[str, int]] = {}
+
+    def observe(self, stage: str, value_ms: float) -> None:
+        hist = self.histograms.get(stage)
+        if hist is None:
+            hist = self.histograms[stage] = Histogram()
+        hist.observe(value_ms)
+
+    @contextmanager
+    def timer(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, (time.perf_counter() - start) * 1000)
+
+    def inc(self, name: str, label: str = "", value: int = 1) -> None:
+        values = self.counters.setdefault(name, {})
+        values[label] = values.get(label, 0) + value
+
+    def render_text(
+        self,
+        extra: Dict[str, Dict[str, int]] | None = None,
+        gauges: Dict[str, Dict[str, int]] | None = None,
+    ) -> str:
+        """供 /sha stats 输出的简要文本；extra 为累计计数，gauges 为当前值（如缓存条目数）"""
+        uptime = int(time.time() - self.started)
+        lines = [f"📊 审阅流程统计（运行 {uptime // 3600}小时{uptime % 3600 // 60}分）", "阶段耗时 (次数 | 平均/p50/p95/最大 ms)："]
+        for stage, hist in sorted(self.histograms.items()):
+            avg = hist.total / hist.count if hist.count else 0.0
+            lines.append(
+                f"  {stage}: {hist.count} | {avg:.1f}/{hist.quantile(0.5):.1f}/{hist.quantile(0.95):.1f}/{hist.max:.1f}"
+            )
+        counters = dict(self.counters)
+        counters.update(extra or {})
+        counters.update(gauges or {})
+        for name, values in sorted(counters.items()):
+            shown = "，".join(f"{label or '总计'}={n}" for label, n in sorted(values.items(), key=lambda kv: str(kv[0])))
+            lines.append(f"{name}: {shown or '无'}")
+        return "\n".join(lines)
+
+    def render_prometheus(
+        self,
+        extra: Dict[str, Dict[str, int]] | None = None,
+        gauges: Dict[str, Dict[str, int]] | None = None,
+        prefix: str = "astrbot_sha",
+    ) -> str:
+        """Prometheus 文本格式（可由 node_exporter textfile collector 采集）。
+
+        计数器输出为 <name>_total (counter)，gauges 中的当前值输出为 <name> (gauge)。
+        """
+        out: List[str] = [
+            f"# TYPE {prefix}_stage_duration_ms histogram",
+        ]
+        for stage, hist in sorted(self.histograms.items()):
+            cumulative = 0
+            for bound, n in zip(hist.bounds, hist.counts):
+                cumulative += n
+                out.append(f'{prefix}_stage_duration_ms_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            out.append(f'{prefix}_stage_duration_ms_bucket{{stage="{stage}",le="+Inf"}} {hist.count}')
+            out.append(f'{prefix}_stage_duration_ms_sum{{stage="{stage}"}} {hist.total:.3f}')
+            out.append(f'{prefix}_stage_duration_ms_count{{stage="{stage}"}} {hist.count}')
+        counters = dict(self.counters)
+        counters.update(extra or {})
+        for kind, suffix, values_by_name in (("counter", "_total", counters), ("gauge", "", gauges or {})):
+            for name, values in sorted(values_by_name.items()):
+                metric = f"{prefix}_{name}{suffix}"
+                out.append(f"# TYPE {metric} {kind}")
+                for label, n in sorted(values.items(), key=lambda kv: str(kv[0])):
+                    labels = f'{{label="{label}"}}' if label != "" else ""
+                    out.append(f"{metric}{labels} {n}")
+        return "\n".join(out) + "\n"
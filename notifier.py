@@ -0,0 +1,116 @@
+import time
+import asyncio
+from typing import Any, Dict, List
+
+from astrbot.api import logger
+
+_DIGEST_LABELS = {
+    "approved": "✅ 通过",
+    "rejected": "❌ 拒绝",
+    "rejected_final": "⛔ 今日次数用尽",
+}
+_DIGEST_MAX_IDS = 20
+
+
+class TokenBucket:
+    """令牌桶：rate 为每秒补充的令牌数，burst 为桶容量"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = max(0.01, float(rate))
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class _Notice:
+    __slots__ = ("kind", "user_id", "text")
+
+    def __init__(self, kind: str, user_id: str, text: str):
+        self.kind = kind
+        self.user_id = user_id
+        self.text = text
+
+
+class GroupNotifier:
+    """按群排队、限速并合并的群通知发送器。
+
+    submit 立即返回，审阅流程不再等待消息发送。每个群有独立的队列与令牌桶；
+    合并窗口内或等待令牌期间积累的多条通知会合并为一条汇总消息。
+    """
+
+    def __init__(self, rate_per_minute: float = 20, burst: int = 3, merge_window: float = 1.0):
+        self.rate = max(1.0, float(rate_per_minute)) / 60
+        self.burst = burst
+        self.merge_window = max(0.0, float(merge_window))
+        self._queues: Dict[tuple, List[_Notice]] = {}
+        self._buckets: Dict[tuple, TokenBucket] = {}
+        self._workers: Dict[tuple, asyncio.Task] = {}
+        self._bots: Dict[tuple, Any] = {}
+        self.sent = 0
+        self.merged = 0
+
+    def submit(self, bot: Any, self_id: str, group_id: str, kind: str, user_id: str, text: str) -> None:
+        key = (str(self_id), str(group_id))
+        self._bots[key] = bot
+        self._queues.setdefault(key, []).append(_Notice(kind, str(user_id), text))
+        worker = self._workers.get(key)
+        if worker is None or worker.done():
+            self._workers[key] = asyncio.create_task(self._run(key))
+
+    async def _run(self, key: tuple) -> None:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+        if self.merge_window:
+            await asyncio.sleep(self.merge_window)
+        while self._queues.get(key):
+            await bucket.acquire()
+            batch = self._queues.pop(key, [])
+            if not batch:
+                break
+            message = batch[0].text if len(batch) == 1 else self._format_digest(batch)
+            try:
+                await self._bots[key].send_group_msg(group_id=key[1], message=message)
+                self.sent += 1
+                self.merged += len(batch) - 1
+            except Exception as e:
+                logger.error(f"[审阅加群] 发送群内通知失败 group_id={key[1]} ({len(batch)} 条): {e}")
+
+    @staticmethod
+    def _format_digest(batch: List[_Notice]) -> str:
+        by_kind: Dict[str, List[str]] = {}
+        for notice in batch:
+            by_kind.setdefault(notice.kind, []).append(notice.user_id)
+
+        summary = "，".join(
+            f"{_DIGEST_LABELS.get(kind, kind)} {len(users)} 人" for kind, users in by_kind.items()
+        )
+        lines = [f"审阅结果汇总（共 {len(batch)} 条）：{summary}"]
+        for kind, users in by_kind.items():
+            shown = "、".join(users[:_DIGEST_MAX_IDS])
+            more = f" 等 {len(users)} 人" if len(users) > _DIGEST_MAX_IDS else ""
+            lines.append(f"{_DIGEST_LABELS.get(kind, kind)}：{shown}{more}")
+        return "\n".join(lines)
+
+    async def close(self) -> None:
+        """取消所有发送任务，未发送的通知将被丢弃"""
+        for worker in self._workers.values():
+            if not worker.done():
+                worker.cancel()
+        for worker in self._workers.values():
+            try:
+                await worker
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._workers.clear()
+        self._queues.clear()
@@ -0,0 +1,102 @@
+import sys
+import heapq
+import time
+from typing import Any, Dict, Hashable, List
+
+from .ids import pair_key, split_pair_key
+
+
+class PendingRecord:
+    """一条待审入群请求。使用 __slots__ 而不是 dict，sub_type 只有少数几种取值，做驻留处理。
+
+    flag 每条请求各不相同，驻留没有收益，按原样保存。
+    """
+
+    __slots__ = ("flag", "sub_type", "comment", "ts")
+
+    def __init__(self, flag: str, sub_type: str = "add", comment: str = "", ts: int = 0):
+        self.flag = str(flag)
+        self.sub_type = sys.intern(str(sub_type or "add"))
+        self.comment = str(comment or "")
+        self.ts = int(ts)
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "PendingRecord":
+        return cls(data.get("flag", ""), data.get("sub_type"), data.get("comment"), data.get("ts", 0))
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"flag": self.flag, "sub_type": self.sub_type, "comment": self.comment, "ts": self.ts}
+
+
+class PendingRequestCache:
+    """待审入群请求缓存，键为打包后的 (群号, QQ 号)，序列化时转换为 群号 → 用户 → 记录 的 JSON 结构。
+
+    另外维护一个按时间排序的最小堆用于过期：插入为 O(log n)，过期只需从堆顶弹出
+    已过期的条目，不再在每次插入时遍历全部请求。被覆盖或删除的记录在堆中惰性失效。
+    """
+
+    def __init__(self, ttl_seconds: int = 48 * 3600):
+        self.ttl_seconds = max(0, int(ttl_seconds))
+        self._data: Dict[Hashable, PendingRecord] = {}
+        self._heap: List[tuple[int, Hashable]] = []
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def load(self, data: Dict[str, Dict[str, Dict[str, Any]]]) -> None:
+        self._data = {}
+        for group_id, users in (data or {}).items():
+            for user_id, record in (users or {}).items():
+                self._data[pair_key(group_id, user_id)] = PendingRecord.from_json(record)
+        self._heap = [(record.ts, key) for key, record in self._data.items()]
+        heapq.heapify(self._heap)
+
+    def to_json(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        data: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for group_id, user_id, record in self.items():
+            data.setdefault(group_id, {})[user_id] = record.to_json()
+        return data
+
+    def get(self, group_id: str, user_id: str) -> PendingRecord | None:
+        return self._data.get(pair_key(group_id, user_id))
+
+    def put(self, group_id: str, user_id: str, record: PendingRecord) -> None:
+        key = pair_key(group_id, user_id)
+        self._data[key] = record
+        heapq.heappush(self._heap, (record.ts, key))
+        self._maybe_compact()
+
+    def pop(self, group_id: str, user_id: str) -> PendingRecord | None:
+        record = self._data.pop(pair_key(group_id, user_id), None)
+        if record is not None:
+            self._maybe_compact()
+        return record
+
+    def expire(self, now: int | None = None) -> List[tuple[str, str]]:
+        """删除超过 TTL 的请求，返回被删除的 (group_id, user_id) 列表"""
+        expire_before = int(now if now is not None else time.time()) - self.ttl_seconds
+        removed: List[tuple[str, str]] = []
+        heap = self._heap
+        while heap and heap[0][0] < expire_before:
+            ts, key = heapq.heappop(heap)
+            record = self._data.get(key)
+            # 堆中条目与当前记录的时间戳不一致，说明记录已被覆盖或删除
+            if record is None or record.ts != ts:
+                continue
+            del self._data[key]
+            group_id, user_id = split_pair_key(key)
+            removed.append((str(group_id), str(user_id)))
+        self.evicted += len(removed)
+        return removed
+
+    def _maybe_compact(self) -> None:
+        if len(self._heap) > 2 * len(self._data) + 64:
+            self._heap = [(record.ts, key) for key, record in self._data.items()]
+            heapq.heapify(self._heap)
+
+    def items(self):
+        """遍历 (group_id, user_id, record)"""
+        for key, record in self._data.items():
+            group_id, user_id = split_pair_key(key)
+            yield str(group_id), str(user_id), record
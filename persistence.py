@@ -0,0 +1,341 @@
+import os
+import json
+import stat
+import time
+import asyncio
+import tempfile
+from json.decoder import WHITESPACE
+from typing import Any, Callable, Dict, Iterator, List
+
+from astrbot.api import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def atomic_write_text(path: str, data: str) -> None:
+    """先写临时文件再 os.replace，避免写到一半时崩溃留下损坏的文件。
+
+    临时文件名在同一目录下唯一，多个进程同时写同一个文件时不会截断或替换彼此的临时文件。
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+    try:
+        with open(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp 创建的文件权限为 0600，沿用原文件的权限
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+_DECODER = json.JSONDecoder()
+
+
+def iter_json_object(text: str) -> Iterator[tuple[str, Any]]:
+    """逐项解析顶层 JSON 对象的键值对。
+
+    json.loads 解析整个大文件是一次 C 调用，期间始终持有 GIL，即使放在线程中也会阻塞
+    事件循环；逐项 raw_decode 可以让解释器在各项之间切换回事件循环线程。
+    """
+    idx = WHITESPACE.match(text, 0).end()
+    if text[idx: idx + 1] != "{":
+        raise ValueError("顶层不是 JSON 对象")
+    idx = WHITESPACE.match(text, idx + 1).end()
+    if text[idx: idx + 1] == "}":
+        return
+    while True:
+        key, idx = _DECODER.raw_decode(text, idx)
+        idx = WHITESPACE.match(text, idx).end()
+        if text[idx: idx + 1] != ":":
+            raise ValueError(f"JSON 格式错误 (位置 {idx})")
+        idx = WHITESPACE.match(text, idx + 1).end()
+        value, idx = _DECODER.raw_decode(text, idx)
+        yield key, value
+        idx = WHITESPACE.match(text, idx).end()
+        sep = text[idx: idx + 1]
+        idx = WHITESPACE.match(text, idx + 1).end()
+        if sep == "}":
+            return
+        if sep != ",":
+            raise ValueError(f"JSON 格式错误 (位置 {idx})")
+
+
+def dumps_json_object(data: Dict[str, Any]) -> str:
+    """逐项序列化顶层对象，与 iter_json_object 对应，同样避免长时间持有 GIL"""
+    return "{" + ",".join(
+        f"{json.dumps(str(key), ensure_ascii=False)}:{json.dumps(value, ensure_ascii=False, separators=(',', ':'))}"
+        for key, value in data.items()
+    ) + "}"
+
+
+def read_json(path: str) -> Any:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if text.lstrip().startswith("{"):
+        return dict(iter_json_object(text))
+    return json.loads(text)
+
+
+def read_json_object(path: str) -> Dict[str, Any]:
+    """读取顶层为对象的 JSON 文件，文件不存在时返回空字典。
+
+    文件损坏（例如旧版本非原子写入时被截断）时改名为 *.corrupt 并返回空字典，否则之后
+    每次合并写入都会失败，状态再也无法保存。调用方需持有该文件的锁。
+    """
+    try:
+        data = read_json(path)
+        if data is None or isinstance(data, dict):
+            return data or {}
+        reason = "顶层不是 JSON 对象"
+    except ValueError as e:
+        reason = str(e)
+    logger.error(f"[审阅加群] {os.path.basename(path)} 已损坏 ({reason})，改名为 .corrupt 后从空数据开始")
+    os.replace(path, f"{path}.corrupt")
+    return {}
+
+
+# 写入连续失败达到该次数后暂停自动重试；卸载时最后一次写入的最长等待时间（秒）
+FLUSH_MAX_RETRIES = 5
+CLOSE_TIMEOUT = 5.0
+
+
+class FileLock:
+    """跨进程的建议性文件锁（POSIX flock / Windows msvcrt），用于多个 AstrBot 进程共享数据目录。
+
+    获取锁会阻塞，只应在线程中使用（例如经 asyncio.to_thread 调用）。
+    """
+
+    def __init__(self, path: str, timeout: float = 10.0):
+        self.path = path
+        self.timeout = float(timeout)
+        self._fd: int | None = None
+
+    def __enter__(self) -> "FileLock":
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                self._fd = fd
+                return self
+            except OSError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise TimeoutError(f"获取文件锁超时: {self.path}")
+                time.sleep(0.01)
+
+    def __exit__(self, *exc) -> None:
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+
+class DebouncedFlusher:
+    """防抖的后台写入。
+
+    mark_dirty 只做标记；在 delay 秒的防抖窗口结束、或累计修改次数达到 max_dirty 时，
+    才调用 _write_state 写入。写入失败时退避重试，连续失败 max_retries 次后暂停，
+    直到下一次修改。terminate 时调用 close 在限定时间内最后写入一次，仍失败时 _discard。
+    """
+
+    def __init__(
+        self,
+        label: str,
+        delay: float = 1.0,
+        max_dirty: int = 100,
+        on_flush: Callable[[float], None] | None = None,
+        max_retries: int = FLUSH_MAX_RETRIES,
+        close_timeout: float = CLOSE_TIMEOUT,
+    ):
+        self.label = label
+        self.delay = float(delay)
+        self.max_dirty = max(1, int(max_dirty))
+        self._on_flush = on_flush
+        self.max_retries = max(1, int(max_retries))
+        self.close_timeout = float(close_timeout)
+        self._dirty = 0
+        self._failures = 0
+        self._closing = False
+        self._task: asyncio.Task | None = None
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self.flush_count = 0
+        self.last_flush_ms = 0.0
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty > 0
+
+    def mark_dirty(self) -> None:
+        self._dirty += 1
+        if self._closing:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+        elif self._dirty >= self.max_dirty and not self._failures:
+            self._wake.set()
+
+    async def _flush_loop(self) -> None:
+        while self._dirty and not self._closing:
+            # 写入失败后按 2 的指数退避，最长 32 倍 delay
+            delay = self.delay * (1 << min(self._failures, 5))
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if self._closing:
+                break
+            await self.flush()
+            if self._failures >= self.max_retries:
+                # 不再自行重试，修改保留在内存中，下次修改时再尝试写入
+                logger.error(f"[审阅加群] 保存 {self.label} 连续失败 {self._failures} 次，暂停写入")
+                break
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, 0
+            start = time.perf_counter()
+            try:
+                await self._write_state()
+            except asyncio.CancelledError:
+                # 只在卸载超时时发生，线程中的写入可能已经完成，不再放回重试
+                logger.error(f"[审阅加群] 保存 {self.label} 超时，丢弃 {dirty} 次修改")
+                raise
+            except Exception as e:
+                self._dirty += dirty
+                self._failures += 1
+                logger.error(f"[审阅加群] 保存 {self.label} 失败: {e}")
+                return
+            self._failures = 0
+            self.flush_count += 1
+            self.last_flush_ms = (time.perf_counter() - start) * 1000
+            if self._on_flush:
+                self._on_flush(self.last_flush_ms)
+            logger.debug(
+                f"[审阅加群] 已保存 {self.label} (合并 {dirty} 次修改, {self.last_flush_ms:.1f}ms)"
+            )
+
+    async def _write_state(self) -> None:
+        """写入当前状态；失败时抛出异常，并保留未写入的修改以便重试"""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """跳过防抖等待，在 close_timeout 秒内最后写入一次剩余修改，仍失败时记录日志并丢弃"""
+        self._closing = True
+        deadline = time.monotonic() + self.close_timeout
+        task, self._task = self._task, None
+        if task and not task.done():
+            # 写入循环在当前这次写入结束后退出
+            self._wake.set()
+            await asyncio.wait({task}, timeout=self.close_timeout)
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        if self._dirty:
+            try:
+                await asyncio.wait_for(self.flush(), timeout=max(0.1, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                pass
+        if self._dirty:
+            logger.error(f"[审阅加群] 卸载时仍无法保存 {self.label}，丢弃 {self._dirty} 次未保存的修改")
+            self._discard()
+
+    def _discard(self) -> None:
+        self._dirty = 0
+
+
+class DebouncedJsonWriter(DebouncedFlusher):
+    """写回式 JSON 持久化：写入时把完整状态紧凑序列化，并在线程中原子写入文件。"""
+
+    def __init__(self, path: str, get_state: Callable[[], Any], name: str = "", **kwargs):
+        super().__init__(name or os.path.basename(path), **kwargs)
+        self.path = path
+        self._get_state = get_state
+
+    async def _write_state(self) -> None:
+        # 在事件循环中序列化得到一致的快照，文件写入放到线程中
+        data = json.dumps(self._get_state(), ensure_ascii=False, separators=(",", ":"))
+        await asyncio.to_thread(atomic_write_text, self.path, data)
+
+
+class MergingJsonWriter(DebouncedJsonWriter):
+    """多进程共享的 JSON 文件写入器。
+
+    修改以操作日志的形式记录（record），写入时在文件锁内读取文件当前内容、依次应用
+    apply_ops、再原子替换，因此多个进程写同一个文件时不会互相覆盖对方的修改。
+    on_merged 在写入成功后以合并后的完整数据回调，可用于同步其他进程的修改。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        apply_ops: Callable[[Any, List[tuple]], Any],
+        on_merged: Callable[[Any], None] | None = None,
+        **kwargs,
+    ):
+        super().__init__(path, get_state=lambda: None, **kwargs)
+        self.lock_path = f"{path}.lock"
+        self._apply_ops = apply_ops
+        self._on_merged = on_merged
+        self._ops: List[tuple] = []
+
+    def _discard(self) -> None:
+        super()._discard()
+        self._ops = []
+
+    @property
+    def pending_ops(self) -> List[tuple]:
+        """尚未写入文件的操作"""
+        return self._ops
+
+    def record(self, op: tuple) -> None:
+        self._ops.append(op)
+        self.mark_dirty()
+
+    def _merge_sync(self, ops: List[tuple]) -> Any:
+        with FileLock(self.lock_path):
+            data = self._apply_ops(read_json_object(self.path), ops)
+            atomic_write_text(self.path, dumps_json_object(data))
+        return data
+
+    async def _write_state(self) -> None:
+        ops, self._ops = self._ops, []
+        try:
+            merged = await asyncio.to_thread(self._merge_sync, ops)
+        except Exception:
+            # 写入失败时把操作放回日志，下次写入时重试
+            self._ops[:0] = ops
+            raise
+        if self._on_merged:
+            self._on_merged(merged)
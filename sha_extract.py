@@ -0,0 +1,89 @@
+import re
+import unicodedata
+from typing import List
+
+# 申请附言在 QQ 中本身有长度限制，超出部分不参与提取，避免异常输入拖慢审阅
+MAX_INPUT_CHARS = 512
+MIN_SHA_LEN = 7
+MAX_SHA_LEN = 40
+# SHA 分段之间允许的分隔符（NFKC 之后，全角空格、全角连字符等已转换为 ASCII）
+DEFAULT_SEPARATORS = " -_:"
+# 两段之间最多允许的分隔符字符数，例如 "abc12 - 34ef"
+MAX_GAP = 3
+
+_HEX_RUN = re.compile(r"[0-9a-f]+")
+
+
+def _fullwidth(chars: str) -> str:
+    """ASCII 可见字符对应的全角形式（空格对应全角空格 U+3000）"""
+    return "".join(
+        "\u3000" if c == " " else chr(ord(c) + 0xFEE0) for c in chars if " " <= c <= "~"
+    )
+
+
+# 十六进制与字母数字字符类，包含全角形式，匹配到的片段再做 NFKC 规范化
+_HEX = "0-9a-fA-F" + "{}-{}{}-{}{}-{}".format(*_fullwidth("09afAF"))
+_ALNUM = "0-9a-zA-Z" + "{}-{}{}-{}{}-{}".format(*_fullwidth("09azAZ"))
+
+
+class ShaCandidateExtractor:
+    """单遍扫描的 SHA 前缀候选提取器，支持全角字符与被分隔符拆开的 SHA"""
+
+    def __init__(self, separators: str = DEFAULT_SEPARATORS, max_input: int = MAX_INPUT_CHARS):
+        self.separators = "".join(sorted(set(unicodedata.normalize("NFKC", separators or ""))))
+        self.max_input = max(MAX_SHA_LEN, int(max_input))
+        # 纯 ASCII 文本中出现 "十六进制段-分隔符-十六进制" 时才可能有被拆开的 SHA，需要走完整扫描
+        self._has_split = re.compile(
+            rf"[0-9a-fA-F](?<![0-9a-zA-Z].)[0-9a-fA-F]*[{re.escape(self.separators)}]{{1,{MAX_GAP}}}[0-9a-fA-F]"
+        ).search if self.separators else None
+        chain = ""
+        if self.separators:
+            seps = re.escape(self.separators + _fullwidth(self.separators))
+            chain = f"(?:[{seps}]{{1,{MAX_GAP}}}[{_HEX}]+)*"
+        # (?<![...].) 在匹配第一个字符之后检查其前一个字符，等价于开头的 (?<![...])
+        self._pattern = re.compile(rf"[{_HEX}](?<![{_ALNUM}].)[{_HEX}]*{chain}(?![{_ALNUM}])")
+        self._plain_pattern = re.compile(
+            rf"[0-9a-fA-F](?<![0-9a-zA-Z].)[0-9a-fA-F]{{{MIN_SHA_LEN - 1},{MAX_SHA_LEN - 1}}}(?![0-9a-zA-Z])"
+        )
+
+    def extract(self, text: str) -> List[str]:
+        if not text:
+            return []
+        text = text[: self.max_input]
+        if text.isascii() and (self._has_split is None or self._has_split(text) is None):
+            # 快速路径：不可能出现全角字符或被拆开的 SHA，一次限定长度的 findall 即可
+            runs = self._plain_pattern.findall(text)
+            if len(runs) <= 1:
+                return [run.lower() for run in runs]
+            seen: set = set()
+            return [run for run in map(str.lower, runs) if not (run in seen or seen.add(run))]
+
+        found: dict = {}
+        for run in self._pattern.findall(text):
+            if len(run) < MIN_SHA_LEN:
+                continue
+            if not run.isascii():
+                run = unicodedata.normalize("NFKC", run)
+            run = run.lower()
+            # 分隔符都不是字母数字，isalnum 即可判断是否为单独一段
+            if run.isalnum():
+                if len(run) <= MAX_SHA_LEN:
+                    found[run] = None
+            else:
+                self._add_joined(_HEX_RUN.findall(run), found)
+        return list(found)
+
+    @staticmethod
+    def _add_joined(parts: List[str], found: dict) -> None:
+        """链上每一段及其向后拼接的结果；超过 40 位的段不可能是 SHA，视为链的断点"""
+        for i, joined in enumerate(parts):
+            if len(joined) > MAX_SHA_LEN:
+                continue
+            if len(joined) >= MIN_SHA_LEN:
+                found[joined] = None
+            for part in parts[i + 1:]:
+                joined += part
+                if len(joined) > MAX_SHA_LEN:
+                    break
+                if len(joined) >= MIN_SHA_LEN:
+                    found[joined] = None
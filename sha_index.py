@@ -0,0 +1,142 @@
+import time
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Deque, Dict, Iterable, List
+
+MATCH_UNIQUE = "unique"
+MATCH_AMBIGUOUS = "ambiguous"
+MATCH_NONE = "none"
+
+
+class ShaPrefixIndex:
+    """已排序的 SHA 列表，使用二分查找做前缀匹配，复杂度 O(候选数 × log 提交数)。"""
+
+    __slots__ = ("_shas",)
+
+    def __init__(self, shas: Iterable[str] = ()):
+        self._shas: List[str] = sorted({s.lower() for s in shas if s})
+
+    def __len__(self) -> int:
+        return len(self._shas)
+
+    def __iter__(self):
+        return iter(self._shas)
+
+    def lookup(self, prefix: str, limit: int = 2) -> List[str]:
+        """返回以 prefix 开头的 SHA（最多 limit 个，足以判断是否唯一）"""
+        prefix = prefix.lower()
+        shas = self._shas
+        i = bisect_left(shas, prefix)
+        found: List[str] = []
+        while i < len(shas) and len(found) < limit and shas[i].startswith(prefix):
+            found.append(shas[i])
+            i += 1
+        return found
+
+    def match(self, candidates: Iterable[str], min_len: int = 7) -> tuple[str, str | None]:
+        """按顺序匹配候选前缀。
+
+        返回 (状态, 命中的前缀)：优先返回第一个唯一匹配；若只有对应多个提交的
+        前缀命中，则返回 ambiguous；都未命中时返回 none。
+        """
+        ambiguous: str | None = None
+        for cand in candidates:
+            if len(cand) < min_len:
+                continue
+            found = self.lookup(cand)
+            if len(found) == 1:
+                return MATCH_UNIQUE, cand
+            if found and ambiguous is None:
+                ambiguous = cand
+        if ambiguous is not None:
+            return MATCH_AMBIGUOUS, ambiguous
+        return MATCH_NONE, None
+
+
+def _commit_time(commit: Dict[str, Any]) -> datetime | None:
+    try:
+        raw = commit["commit"]["committer"]["date"]
+        return datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class CommitWindow:
+    """有界的最近提交窗口（新 → 旧），支持增量合并。
+
+    新拉取的提交只需要取到与窗口中已有提交衔接的位置即可，旧提交从尾部淘汰；
+    max_age_days > 0 时还会按提交时间裁剪。
+    """
+
+    def __init__(self, max_size: int, max_age_days: int = 0):
+        self.max_size = max(1, int(max_size))
+        self.max_age_days = max(0, int(max_age_days))
+        self._commits: Deque[Dict[str, Any]] = deque(maxlen=self.max_size)
+        self._known: set[str] = set()
+        self.index = ShaPrefixIndex()
+        # 最近一次合并的数据获取时间（墙上时钟），用于跳过更旧的共享快照
+        self.merged_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._commits)
+
+    def contains(self, sha: str) -> bool:
+        return sha.lower() in self._known
+
+    def since(self) -> str | None:
+        """按时间限定窗口时，返回 GitHub API 的 since 参数"""
+        if not self.max_age_days:
+            return None
+        start = datetime.now(timezone.utc) - timedelta(days=self.max_age_days)
+        return start.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def merge(self, fresh: List[Dict[str, Any]], fetched_at: float | None = None) -> int:
+        """合并按新 → 旧排列的提交，返回新增数量。
+
+        fresh 中找不到与窗口衔接的提交时（首次加载或分支被强推），整体替换窗口；
+        窗口中位于衔接提交之前的条目已被强推改写，会被丢弃。fetched_at 为快照的获取时间，
+        早于上一次合并的数据（如过期的共享快照）时不合并；不传时视为刚从分支头部直接获取。
+        """
+        direct = fetched_at is None
+        if direct:
+            fetched_at = time.time()
+        elif fetched_at < self.merged_at:
+            return 0
+        self.merged_at = fetched_at
+
+        overlap = None
+        for i, commit in enumerate(fresh):
+            if self.contains(commit.get("sha", "")):
+                overlap = i
+                break
+
+        if overlap is None:
+            self._commits.clear()
+            self._commits.extend(c for c in fresh[: self.max_size] if "sha" in c)
+            added = len(self._commits)
+        else:
+            if overlap > 0 or direct:
+                # 窗口中位于衔接提交之前的条目已不在分支上（强推回退或改写），先丢弃；
+                # 快照的 overlap 为 0 时可能只是比窗口旧（如滞后的副本），不能回退窗口
+                anchor = fresh[overlap]["sha"].lower()
+                while self._commits and self._commits[0]["sha"].lower() != anchor:
+                    self._commits.popleft()
+            new = [c for c in fresh[:overlap] if "sha" in c]
+            self._commits.extendleft(reversed(new))
+            added = len(new)
+
+        if self.max_age_days:
+            start = datetime.now(timezone.utc) - timedelta(days=self.max_age_days)
+            while self._commits:
+                ts = _commit_time(self._commits[-1])
+                if ts is None or ts >= start:
+                    break
+                self._commits.pop()
+
+        self._known = {c["sha"].lower() for c in self._commits}
+        self.index = ShaPrefixIndex(self._known)
+        return added
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return list(self._commits)
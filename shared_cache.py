@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+from astrbot.api import logger
+
+from .persistence import FileLock, atomic_write_text, read_json
+
+# fetch() -> (提交列表, etag)
+Fetcher = Callable[[], Awaitable[tuple[List[Dict[str, Any]], str | None]]]
+
+
+class SharedCommitStore:
+    """多个 AstrBot 进程共享的提交快照。
+
+    每个提交窗口在数据目录下保存一份快照（提交列表、ETag、获取时间）。快照过期时，
+    只有取得租约的进程访问 GitHub 并写回快照，其余进程轮询等待新快照出现；
+    租约持有者崩溃或超时后，等待方在租约到期时自行获取。时间均使用墙上时钟以便跨进程比较。
+    """
+
+    def __init__(self, directory: str, lease_seconds: float = 20.0, poll_interval: float = 0.1):
+        self.directory = directory
+        self.lease_seconds = max(1.0, float(lease_seconds))
+        self.poll_interval = poll_interval
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.hits = 0
+        self.fetches = 0
+        self.waits = 0
+
+    def _path(self, key: Hashable) -> str:
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def _read_sync(self, key: Hashable) -> Dict[str, Any] | None:
+        try:
+            snapshot = read_json(self._path(key))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(snapshot, dict) or snapshot.get("key") != repr(key):
+            return None
+        return snapshot
+
+    def _write_sync(self, key: Hashable, commits: List[Dict[str, Any]], etag: str | None) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        snapshot = {"key": repr(key), "etag": etag, "fetched_at": time.time(), "commits": commits}
+        atomic_write_text(self._path(key), json.dumps(snapshot, ensure_ascii=False, separators=(",", ":")))
+
+    def _read_many_sync(self, keys: List[Hashable]) -> Dict[Hashable, Dict[str, Any]]:
+        snapshots = {}
+        for key in keys:
+            snapshot = self._read_sync(key)
+            if snapshot is not None:
+                snapshots[key] = snapshot
+        return snapshots
+
+    def _try_acquire_sync(self, key: Hashable) -> bool:
+        """租约未被占用或已过期时写入自己的租约"""
+        os.makedirs(self.directory, exist_ok=True)
+        lease_path = self._path(key)[:-5] + ".lease"
+        with FileLock(f"{lease_path}.lock"):
+            try:
+                lease = read_json(lease_path) or {}
+            except (OSError, ValueError):
+                lease = {}
+            now = time.time()
+            if lease.get("owner") not in (None, self.owner) and lease.get("until", 0) > now:
+                return False
+            atomic_write_text(lease_path, json.dumps({"owner": self.owner, "until": now + self.lease_seconds}))
+            return True
+
+    def _release_sync(self, key: Hashable) -> None:
+        lease_path = self._path(key)[:-5] + ".lease"
+        with FileLock(f"{lease_path}.lock"):
+            try:
+                lease = read_json(lease_path) or {}
+            except (OSError, ValueError):
+                return
+            if lease.get("owner") == self.owner:
+                os.remove(lease_path)
+
+    async def read(self, key: Hashable) -> Dict[str, Any] | None:
+        return await asyncio.to_thread(self._read_sync, key)
+
+    async def publish(self, key: Hashable, commits: List[Dict[str, Any]], etag: str | None = None) -> None:
+        """写入本进程通过其他途径（如 GraphQL 批量查询）得到的提交"""
+        try:
+            await asyncio.to_thread(self._write_sync, key, commits, etag)
+        except Exception as e:
+            logger.warning(f"[GitHub] 写入共享提交快照失败: {e}")
+
+    async def get(self, key: Hashable, max_age: float, fetch: Fetcher) -> Dict[str, Any]:
+        """返回不超过 max_age 秒的快照；过期时由一个进程调用 fetch 刷新"""
+        snapshot = await self.read(key)
+        if snapshot and time.time() - snapshot.get("fetched_at", 0) < max_age:
+            self.hits += 1
+            return snapshot
+
+        seen = snapshot.get("fetched_at", 0) if snapshot else 0
+        deadline = time.monotonic() + self.lease_seconds
+        while True:
+            if await asyncio.to_thread(self._try_acquire_sync, key):
+                try:
+                    # 取得租约前，其他进程可能刚刚写回快照并释放了租约
+                    fresh = await self.read(key)
+                    if fresh and (
+                        fresh.get("fetched_at", 0) > seen
+                        or time.time() - fresh.get("fetched_at", 0) < max_age
+                    ):
+                        self.hits += 1
+                        return fresh
+                    return await self._fetch(key, fetch)
+                finally:
+                    await asyncio.to_thread(self._release_sync, key)
+            # 其他进程正在获取，等待其写回快照
+            self.waits += 1
+            await asyncio.sleep(self.poll_interval)
+            snapshot = await self.read(key)
+            if snapshot and snapshot.get("fetched_at", 0) > seen:
+                self.hits += 1
+                return snapshot
+            if time.monotonic() >= deadline:
+                logger.warning(f"[GitHub] 等待其他进程刷新提交超时，自行获取 {key[0]}@{key[1]}")
+                return await self._fetch(key, fetch)
+
+    async def get_many(
+        self, keys: List[Hashable], max_age: float, fetch: Callable[[], Awaitable[None]]
+    ) -> Dict[Hashable, Dict[str, Any]]:
+        """批量版本的 get：所有快照共用一个租约，任一快照过期时只由一个进程调用 fetch
+        一次性刷新（fetch 自行 publish 各个快照），其余进程等租约释放后读取写回的快照。
+
+        返回可直接使用的快照；本进程执行了 fetch 时返回空字典。
+        """
+        snapshots = await asyncio.to_thread(self._read_many_sync, keys)
+        now = time.time()
+        if len(snapshots) == len(keys) and all(now - s.get("fetched_at", 0) < max_age for s in snapshots.values()):
+            self.hits += 1
+            return snapshots
+
+        seen = {key: s.get("fetched_at", 0) for key, s in snapshots.items()}
+        lease_key = ("batch", tuple(keys))
+        deadline = time.monotonic() + self.lease_seconds
+        while True:
+            if await asyncio.to_thread(self._try_acquire_sync, lease_key):
+                try:
+                    # 租约空闲说明上一个持有者（如有）已刷新完毕；有快照比之前读到的新即视为已刷新
+                    fresh = await asyncio.to_thread(self._read_many_sync, keys)
+                    if any(s.get("fetched_at", 0) > seen.get(key, 0) for key, s in fresh.items()):
+                        self.hits += 1
+                        return fresh
+                    self.fetches += 1
+                    await fetch()
+                    return {}
+                finally:
+                    await asyncio.to_thread(self._release_sync, lease_key)
+            # 其他进程正在批量刷新，等待其释放租约
+            self.waits += 1
+            await asyncio.sleep(self.poll_interval)
+            if time.monotonic() >= deadline:
+                logger.warning(f"[GitHub] 等待其他进程批量刷新提交超时，自行获取 {len(keys)} 个仓库")
+                self.fetches += 1
+                await fetch()
+                return {}
+
+    async def _fetch(self, key: Hashable, fetch: Fetcher) -> Dict[str, Any]:
+        self.fetches += 1
+        commits, etag = await fetch()
+        await self.publish(key, commits, etag)
+        return {"key": repr(key), "etag": etag, "fetched_at": time.time(), "commits": commits}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "fetches": self.fetches, "waits": self.waits}
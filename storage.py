@@ -0,0 +1,505 @@
+import os
+import time
+import sqlite3
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List
+
+from astrbot.api import logger
+
+from .persistence import (
+    CLOSE_TIMEOUT,
+    FLUSH_MAX_RETRIES,
+    DebouncedFlusher,
+    FileLock,
+    MergingJsonWriter,
+    atomic_write_text,
+    dumps_json_object,
+    read_json as _read_json,
+    read_json_object,
+)
+
+PENDING_FILE = "pending_group_requests.json"
+ERROR_COUNT_FILE = "error_counts.json"
+GROUP_JOIN_FILE = "group_join_data.json"
+SQLITE_FILE = "state.sqlite3"
+# 多个进程共享 state.sqlite3 时，等待其他连接释放写锁的最长时间（毫秒）
+SQLITE_BUSY_TIMEOUT_MS = 10000
+
+PendingData = Dict[str, Dict[str, Dict[str, Any]]]
+ErrorCountData = Dict[str, Dict[str, Dict[str, int]]]
+# 启动加载的结果：(数据, 保留条数, 丢弃条数)
+Loaded = tuple[Any, int, int]
+
+
+def _compact_pending(data: PendingData, expire_before: int) -> tuple[int, int]:
+    """原地删除 ts < expire_before 的待审请求，返回 (保留数, 删除数)"""
+    kept = dropped = 0
+    for group_id in list(data):
+        users = data[group_id] or {}
+        for user_id in list(users):
+            if int(users[user_id].get("ts", 0)) < expire_before:
+                del users[user_id]
+                dropped += 1
+            else:
+                kept += 1
+        if not users:
+            del data[group_id]
+    return kept, dropped
+
+
+def _compact_error_counts(data: ErrorCountData, today: str) -> tuple[int, int]:
+    """原地删除 today 以外日期的错误次数，返回 (保留数, 删除数)"""
+    kept = dropped = 0
+    for group_id in list(data):
+        users = data[group_id] or {}
+        for user_id in list(users):
+            dates = users[user_id] or {}
+            for date in list(dates):
+                if date != today:
+                    del dates[date]
+                    dropped += 1
+                else:
+                    kept += 1
+            if not dates:
+                del users[user_id]
+        if not users:
+            del data[group_id]
+    return kept, dropped
+
+
+def _apply_pending_ops(data: PendingData, ops: List[tuple]) -> PendingData:
+    for op in ops:
+        if op[0] == "put":
+            data.setdefault(op[1], {})[op[2]] = op[3]
+        elif op[0] == "del":
+            users = data.get(op[1])
+            if users is not None:
+                users.pop(op[2], None)
+                if not users:
+                    del data[op[1]]
+    return data
+
+
+def _apply_error_ops(data: ErrorCountData, ops: List[tuple]) -> ErrorCountData:
+    for op in ops:
+        if op[0] == "add":
+            dates = data.setdefault(op[1], {}).setdefault(op[2], {})
+            dates[op[3]] = int(dates.get(op[3], 0)) + op[4]
+        elif op[0] == "prune":
+            for group_id in list(data):
+                users = data[group_id]
+                for user_id in list(users):
+                    kept = {d: c for d, c in users[user_id].items() if d == op[1]}
+                    if kept:
+                        users[user_id] = kept
+                    else:
+                        del users[user_id]
+                if not users:
+                    del data[group_id]
+    return data
+
+
+class StateStore:
+    """插件状态（待审请求、错误次数、黑名单）的存储接口。
+
+    插件在内存中保留完整状态用于查询，修改时调用 upsert/delete 系列方法同步到存储；
+    这些方法不阻塞事件循环，实际写入由各后端在后台合并执行。
+
+    多个进程可以共享同一个数据目录：错误次数以增量写入，写入后通过 on_error_counts
+    回调把包含其他进程修改的最新计数（加上本进程尚未写入的增量）同步回内存。
+    """
+
+    name = ""
+
+    async def open(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    def upsert_pending(self, group_id: str, user_id: str, record: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def delete_pending(self, group_id: str, user_id: str) -> None:
+        raise NotImplementedError
+
+    async def load_pending_state(self, expire_before: int) -> Loaded:
+        """启动时在线程中加载待审请求，同时丢弃 ts < expire_before 的请求，有丢弃时把
+        压缩后的结果一次性写回存储"""
+        raise NotImplementedError
+
+    async def load_error_count_state(self, today: str) -> Loaded:
+        """启动时在线程中加载错误次数，同时丢弃 today 以外日期的计数并写回存储"""
+        raise NotImplementedError
+
+    def add_error_count(self, group_id: str, user_id: str, date: str, delta: int = 1) -> None:
+        raise NotImplementedError
+
+    def prune_error_counts(self, keep_date: str) -> None:
+        """删除 keep_date 以外日期的错误次数"""
+        raise NotImplementedError
+
+    async def blacklist_stamp(self) -> Any:
+        """黑名单版本标记，变化时需要重新加载"""
+        raise NotImplementedError
+
+    async def load_blacklist(self) -> Dict[str, Iterable[str]]:
+        raise NotImplementedError
+
+
+class JsonStateStore(StateStore):
+    """原有的 JSON 文件存储。
+
+    写入经 MergingJsonWriter 合并：在文件锁内读取—应用本进程的修改—原子替换，
+    多个进程共享数据目录时不会互相覆盖。
+    """
+
+    name = "json"
+
+    def __init__(
+        self,
+        data_dir: str,
+        on_flush: Callable[[float], None] | None = None,
+        on_error_counts: Callable[[ErrorCountData], None] | None = None,
+    ):
+        self._pending_path = os.path.join(data_dir, PENDING_FILE)
+        self._error_count_path = os.path.join(data_dir, ERROR_COUNT_FILE)
+        self._group_join_path = os.path.join(data_dir, GROUP_JOIN_FILE)
+        self._on_error_counts = on_error_counts
+        self._pending_writer = MergingJsonWriter(
+            self._pending_path, _apply_pending_ops, name="待审缓存", on_flush=on_flush
+        )
+        self._error_count_writer = MergingJsonWriter(
+            self._error_count_path,
+            _apply_error_ops,
+            on_merged=self._error_counts_merged,
+            name="错误次数数据",
+            on_flush=on_flush,
+        )
+
+    @property
+    def writers(self) -> List[MergingJsonWriter]:
+        return [self._pending_writer, self._error_count_writer]
+
+    def _error_counts_merged(self, data: ErrorCountData) -> None:
+        if self._on_error_counts:
+            # 加上合并期间本进程新增、尚未写入文件的增量
+            self._on_error_counts(_apply_error_ops(data, self._error_count_writer.pending_ops))
+
+    async def close(self) -> None:
+        await self._pending_writer.close()
+        await self._error_count_writer.close()
+
+    def upsert_pending(self, group_id: str, user_id: str, record: Dict[str, Any]) -> None:
+        self._pending_writer.record(("put", str(group_id), str(user_id), dict(record)))
+
+    def delete_pending(self, group_id: str, user_id: str) -> None:
+        self._pending_writer.record(("del", str(group_id), str(user_id)))
+
+    @staticmethod
+    def _load_compacted_sync(writer: MergingJsonWriter, compact: Callable, arg: Any) -> tuple[Any, int, int]:
+        # 与 MergingJsonWriter 使用同一把文件锁，避免与其他进程的写入交错
+        with FileLock(writer.lock_path):
+            data = read_json_object(writer.path)
+            kept, dropped = compact(data, arg)
+            if dropped:
+                atomic_write_text(writer.path, dumps_json_object(data))
+        return data, kept, dropped
+
+    async def load_pending_state(self, expire_before: int) -> Loaded:
+        return await asyncio.to_thread(
+            self._load_compacted_sync, self._pending_writer, _compact_pending, int(expire_before)
+        )
+
+    async def load_error_count_state(self, today: str) -> Loaded:
+        return await asyncio.to_thread(
+            self._load_compacted_sync, self._error_count_writer, _compact_error_counts, str(today)
+        )
+
+    def add_error_count(self, group_id: str, user_id: str, date: str, delta: int = 1) -> None:
+        self._error_count_writer.record(("add", str(group_id), str(user_id), str(date), int(delta)))
+
+    def prune_error_counts(self, keep_date: str) -> None:
+        self._error_count_writer.record(("prune", str(keep_date)))
+
+    def _stat_group_join(self) -> tuple[int, int] | None:
+        try:
+            st = os.stat(self._group_join_path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    async def blacklist_stamp(self) -> Any:
+        return await asyncio.to_thread(self._stat_group_join)
+
+    async def load_blacklist(self) -> Dict[str, Iterable[str]]:
+        data = await asyncio.to_thread(_read_json, self._group_join_path) or {}
+        return data.get("reject_ids", {}) or {}
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS pending_requests (
+    group_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    flag TEXT NOT NULL,
+    sub_type TEXT NOT NULL,
+    comment TEXT NOT NULL DEFAULT '',
+    ts INTEGER NOT NULL,
+    PRIMARY KEY (group_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_pending_ts ON pending_requests (ts);
+CREATE TABLE IF NOT EXISTS error_counts (
+    group_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (group_id, user_id, date)
+);
+CREATE INDEX IF NOT EXISTS idx_error_counts_date ON error_counts (date);
+CREATE TABLE IF NOT EXISTS blacklist (
+    group_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    PRIMARY KEY (group_id, user_id)
+);
+"""
+
+_UPSERT_PENDING = (
+    "INSERT INTO pending_requests (group_id, user_id, flag, sub_type, comment, ts) "
+    "VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (group_id, user_id) DO UPDATE SET "
+    "flag = excluded.flag, sub_type = excluded.sub_type, comment = excluded.comment, ts = excluded.ts"
+)
+_DELETE_PENDING = "DELETE FROM pending_requests WHERE group_id = ? AND user_id = ?"
+_UPSERT_ERROR_COUNT = (
+    "INSERT INTO error_counts (group_id, user_id, date, count) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (group_id, user_id, date) DO UPDATE SET count = excluded.count"
+)
+_ADD_ERROR_COUNT = (
+    "INSERT INTO error_counts (group_id, user_id, date, count) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (group_id, user_id, date) DO UPDATE SET count = error_counts.count + excluded.count"
+)
+_PRUNE_ERROR_COUNTS = "DELETE FROM error_counts WHERE date != ?"
+
+
+class SqliteStateStore(DebouncedFlusher, StateStore):
+    """SQLite (WAL) 存储：按行 upsert/delete，所有数据库调用在专用线程中执行。
+
+    写操作先进入队列，经 DebouncedFlusher 防抖后以一个事务批量提交，失败时退避重试。
+    首次启动时自动导入已有的 JSON 数据文件。黑名单保存在 blacklist 表中，可直接用 sqlite3 编辑，
+    外部修改通过 PRAGMA data_version 检测。
+    """
+
+    name = "sqlite"
+
+    def __init__(
+        self,
+        data_dir: str,
+        delay: float = 0.2,
+        max_ops: int = 200,
+        on_flush: Callable[[float], None] | None = None,
+        on_error_counts: Callable[[ErrorCountData], None] | None = None,
+        max_retries: int = FLUSH_MAX_RETRIES,
+        close_timeout: float = CLOSE_TIMEOUT,
+    ):
+        super().__init__(
+            "SQLite 数据", delay=delay, max_dirty=max_ops, on_flush=on_flush,
+            max_retries=max_retries, close_timeout=close_timeout,
+        )
+        self._data_dir = data_dir
+        self._path = os.path.join(data_dir, SQLITE_FILE)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sha_sqlite")
+        self._conn: sqlite3.Connection | None = None
+        self._ops: List[tuple[str, tuple]] = []
+        self._on_error_counts = on_error_counts
+
+    async def _run(self, fn: Callable, *args) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    # ---- 以下方法只在数据库线程中执行 ----
+
+    def _open_sync(self) -> None:
+        conn = sqlite3.connect(self._path, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+        conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SQLITE_SCHEMA)
+        conn.commit()
+        self._conn = conn
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone() is None:
+            self._migrate_json_sync()
+
+    def _migrate_json_sync(self) -> None:
+        conn = self._conn
+        pending = _read_json(os.path.join(self._data_dir, PENDING_FILE)) or {}
+        errors = _read_json(os.path.join(self._data_dir, ERROR_COUNT_FILE)) or {}
+        group_join = _read_json(os.path.join(self._data_dir, GROUP_JOIN_FILE)) or {}
+
+        pending_rows = [
+            (str(g), str(u), str(r.get("flag", "")), str(r.get("sub_type") or "add"),
+             str(r.get("comment") or ""), int(r.get("ts", 0)))
+            for g, users in pending.items()
+            for u, r in users.items()
+        ]
+        error_rows = [
+            (str(g), str(u), str(d), int(c))
+            for g, users in errors.items()
+            for u, dates in users.items()
+            for d, c in dates.items()
+        ]
+        blacklist_rows = [
+            (str(g), str(u))
+            for g, users in (group_join.get("reject_ids", {}) or {}).items()
+            for u in (users or [])
+        ]
+        with conn:
+            conn.executemany(_UPSERT_PENDING, pending_rows)
+            conn.executemany(_UPSERT_ERROR_COUNT, error_rows)
+            conn.executemany("INSERT OR IGNORE INTO blacklist (group_id, user_id) VALUES (?, ?)", blacklist_rows)
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', ?)", (str(int(time.time())),))
+        logger.info(
+            f"[审阅加群] 已将 JSON 数据导入 SQLite: 待审 {len(pending_rows)} 条, "
+            f"错误计数 {len(error_rows)} 条, 黑名单 {len(blacklist_rows)} 条"
+        )
+
+    def _apply_sync(self, ops: List[tuple[str, tuple]]) -> ErrorCountData:
+        """执行一批写操作，返回本批涉及的错误次数在提交后的值（含其他进程的累加）"""
+        touched = set()
+        with self._conn:
+            for sql, params in ops:
+                self._conn.execute(sql, params)
+                if sql is _ADD_ERROR_COUNT:
+                    touched.add(params[:3])
+        data: ErrorCountData = {}
+        for g, u, d in touched:
+            row = self._conn.execute(
+                "SELECT count FROM error_counts WHERE group_id = ? AND user_id = ? AND date = ?", (g, u, d)
+            ).fetchone()
+            if row:
+                data.setdefault(g, {}).setdefault(u, {})[d] = row[0]
+        return data
+
+    def _load_pending_sync(self) -> PendingData:
+        data: PendingData = {}
+        for g, u, flag, sub_type, comment, ts in self._conn.execute(
+            "SELECT group_id, user_id, flag, sub_type, comment, ts FROM pending_requests"
+        ):
+            data.setdefault(g, {})[u] = {"flag": flag, "sub_type": sub_type, "comment": comment, "ts": ts}
+        return data
+
+    def _load_pending_state_sync(self, expire_before: int) -> Loaded:
+        with self._conn:
+            dropped = self._conn.execute("DELETE FROM pending_requests WHERE ts < ?", (expire_before,)).rowcount
+        pending = self._load_pending_sync()
+        return pending, sum(len(users) for users in pending.values()), dropped
+
+    def _load_error_count_state_sync(self, today: str) -> Loaded:
+        with self._conn:
+            dropped = self._conn.execute(_PRUNE_ERROR_COUNTS, (today,)).rowcount
+        errors = self._load_error_counts_sync()
+        return errors, sum(len(users) for users in errors.values()), dropped
+
+    def _load_error_counts_sync(self) -> ErrorCountData:
+        data: ErrorCountData = {}
+        for g, u, d, c in self._conn.execute("SELECT group_id, user_id, date, count FROM error_counts"):
+            data.setdefault(g, {}).setdefault(u, {})[d] = c
+        return data
+
+    def _blacklist_stamp_sync(self) -> Any:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _load_blacklist_sync(self) -> Dict[str, List[str]]:
+        data: Dict[str, List[str]] = {}
+        for g, u in self._conn.execute("SELECT group_id, user_id FROM blacklist"):
+            data.setdefault(g, []).append(u)
+        return data
+
+    def _close_sync(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ---- 事件循环侧接口 ----
+
+    async def open(self) -> None:
+        await self._run(self._open_sync)
+        logger.info(f"[审阅加群] 使用 SQLite 存储: {self._path}")
+
+    def _enqueue(self, sql: str, params: tuple) -> None:
+        self._ops.append((sql, params))
+        self.mark_dirty()
+
+    async def _write_state(self) -> None:
+        ops, self._ops = self._ops, []
+        try:
+            counts = await self._run(self._apply_sync, ops)
+        except Exception:
+            # 事务已回滚，把操作放回队列头部，退避后重试（例如其他进程持有写锁）
+            self._ops[:0] = ops
+            raise
+        if counts and self._on_error_counts:
+            # 加上写入期间本进程新增、尚未提交的增量
+            for sql, params in self._ops:
+                g, u, d = params[:3] if sql is _ADD_ERROR_COUNT else (None, None, None)
+                if g is not None and d in counts.get(g, {}).get(u, {}):
+                    counts[g][u][d] += params[3]
+            self._on_error_counts(counts)
+
+    def _discard(self) -> None:
+        super()._discard()
+        self._ops = []
+
+    async def close(self) -> None:
+        """在 close_timeout 秒内最后提交一次剩余操作并关闭连接，仍失败时记录日志并丢弃"""
+        deadline = time.monotonic() + self.close_timeout
+        await super().close()
+        try:
+            await asyncio.wait_for(self._run(self._close_sync), timeout=max(0.1, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            # 数据库线程仍阻塞在上一次提交中，不再等待，连接随线程结束释放
+            logger.error("[审阅加群] 关闭 SQLite 连接超时")
+        self._executor.shutdown(wait=False)
+
+    def upsert_pending(self, group_id: str, user_id: str, record: Dict[str, Any]) -> None:
+        self._enqueue(_UPSERT_PENDING, (
+            str(group_id), str(user_id), str(record.get("flag", "")),
+            str(record.get("sub_type") or "add"), str(record.get("comment") or ""),
+            int(record.get("ts", 0)),
+        ))
+
+    def delete_pending(self, group_id: str, user_id: str) -> None:
+        self._enqueue(_DELETE_PENDING, (str(group_id), str(user_id)))
+
+    async def load_pending_state(self, expire_before: int) -> Loaded:
+        return await self._run(self._load_pending_state_sync, int(expire_before))
+
+    async def load_error_count_state(self, today: str) -> Loaded:
+        return await self._run(self._load_error_count_state_sync, str(today))
+
+    def add_error_count(self, group_id: str, user_id: str, date: str, delta: int = 1) -> None:
+        self._enqueue(_ADD_ERROR_COUNT, (str(group_id), str(user_id), str(date), int(delta)))
+
+    def prune_error_counts(self, keep_date: str) -> None:
+        self._enqueue(_PRUNE_ERROR_COUNTS, (str(keep_date),))
+
+    async def blacklist_stamp(self) -> Any:
+        return await self._run(self._blacklist_stamp_sync)
+
+    async def load_blacklist(self) -> Dict[str, Iterable[str]]:
+        return await self._run(self._load_blacklist_sync)
+
+
+def create_state_store(
+    backend: str,
+    data_dir: str,
+    on_flush: Callable[[float], None] | None = None,
+    on_error_counts: Callable[[ErrorCountData], None] | None = None,
+) -> StateStore:
+    if str(backend).lower() == "sqlite":
+        return SqliteStateStore(data_dir, on_flush=on_flush, on_error_counts=on_error_counts)
+    return JsonStateStore(data_dir, on_flush=on_flush, on_error_counts=on_error_counts)
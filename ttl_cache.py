@@ -0,0 +1,141 @@
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+# loader(etag) -> (value, etag)；value 为 None 表示 304 未修改
+Loader = Callable[[str | None], Awaitable[tuple[Any, str | None]]]
+
+
+class _CacheEntry:
+    __slots__ = ("value", "etag", "fetched_at")
+
+    def __init__(self, value: Any, etag: str | None, fetched_at: float):
+        self.value = value
+        self.etag = etag
+        self.fetched_at = fetched_at
+
+
+class SingleFlightTTLCache:
+    """通用的异步 TTL 缓存，用于提交列表（按仓库/分支/窗口）与群管理员集合（按群号）。
+
+    - 命中且未过期时直接返回，不调用 loader；
+    - 过期后把上次的 ETag 交给 loader 做条件请求，loader 返回 None（如 304）时只刷新时间戳；
+      不需要 ETag 的调用方忽略该参数即可；
+    - 同一个 key 的并发未命中会合并为一次加载（single-flight）。
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = max(0.0, float(ttl))
+        self._entries: Dict[Hashable, _CacheEntry] = {}
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._background: set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.revalidated = 0
+        self.stale_served = 0
+        self.errors = 0
+
+    def peek_with_age(self, key: Hashable) -> tuple[Any, float]:
+        """返回 (缓存值, 距上次成功获取的秒数)，不存在时返回 (None, inf)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, float("inf")
+        return entry.value, time.monotonic() - entry.fetched_at
+
+    def put(self, key: Hashable, value: Any, etag: str | None = None) -> None:
+        """直接写入缓存（例如由批量请求得到的结果）"""
+        self._entries[key] = _CacheEntry(value, etag, time.monotonic())
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    async def get(
+        self,
+        key: Hashable,
+        loader: Loader,
+        force: bool = False,
+        stale_ok: bool = False,
+        stale_max_age: float | None = None,
+    ) -> Any:
+        """获取缓存值。
+
+        force: 忽略 TTL 强制重新验证（后台轮询使用）。
+        stale_ok: 已有旧值时立即返回旧值，并在后台重新验证（stale-while-revalidate）。
+        stale_max_age: 旧值超过该时长（秒）后不再直接返回，改为等待重新加载。
+        """
+        entry = self._entries.get(key)
+        if entry is not None and not force:
+            age = time.monotonic() - entry.fetched_at
+            if age < self.ttl:
+                self.hits += 1
+                return entry.value
+            if stale_ok and (stale_max_age is None or age <= stale_max_age):
+                self.stale_served += 1
+                if key not in self._inflight:
+                    task = asyncio.create_task(self._load(key, loader, entry))
+                    self._background.add(task)
+                    task.add_done_callback(self._on_background_done)
+                return entry.value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        return await self._load(key, loader, entry)
+
+    async def close(self) -> None:
+        """取消后台重新验证任务并等待其结束"""
+        tasks = list(self._background)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _on_background_done(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled():
+            task.exception()
+
+    async def _load(self, key: Hashable, loader: Loader, entry: _CacheEntry | None) -> Any:
+        self.misses += 1
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            value, etag = await loader(entry.etag if entry else None)
+            now = time.monotonic()
+            if value is None and entry is not None:
+                # 304：内容未变化，沿用旧值
+                entry.fetched_at = now
+                self.revalidated += 1
+                value = entry.value
+            else:
+                self._entries[key] = _CacheEntry(value, etag, now)
+            fut.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as e:
+            # 加载失败时保留旧条目，调用方仍可通过 peek 取得最后一次成功的结果
+            self.errors += 1
+            fut.set_exception(e)
+            # 没有其他等待者时避免 "exception was never retrieved" 警告
+            fut.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "revalidated": self.revalidated,
+            "stale_served": self.stale_served,
+            "errors": self.errors,
+        }